@@ -0,0 +1,201 @@
+"""Compares the chart parsers on saved chart pages.
+
+The reference parser is the previous implementation (full page parsed with
+BeautifulSoup, one search per field). Every parser must return the same
+rows as the reference.
+
+Usage: python -m benchmarks.bench_chart [chart_page_1.html chart_page_2.html]
+Without files, the chart pages of benchmarks/pages.py are used.
+"""
+import logging
+import time
+import argparse
+from bs4 import BeautifulSoup, element
+from rymscraper import utils
+from benchmarks import pages
+
+logger = logging.getLogger()
+temps_debut = time.time()
+
+
+def main():
+    args = parse_args()
+    sources = []
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            sources.append(f.read())
+    if not sources:
+        sources = [x[1] for x in pages.get_corpus("chart")]
+
+    parsers = {
+        "reference": get_chart_page_infos_reference,
+        "lxml": lambda x: utils.get_chart_page_infos(x, parser="lxml"),
+    }
+    if utils.HTMLParser is not None:
+        parsers["selectolax"] = lambda x: utils.get_chart_page_infos(
+            x, parser="selectolax"
+        )
+    else:
+        logger.warning("selectolax not installed, skipping its benchmark.")
+
+    expected = [get_chart_page_infos_reference(x) for x in sources]
+    timings = {}
+    for name, parser in parsers.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            results = [parser(x) for x in sources]
+        timings[name] = (time.perf_counter() - start) / (args.repeat * len(sources))
+        if results != expected:
+            raise Exception(f"Parser {name} doesn't return the reference rows.")
+
+    for name, timing in timings.items():
+        logger.info(
+            "%-10s : %7.2f ms per page (x%.1f)",
+            name,
+            timing * 1000,
+            timings["reference"] / timing,
+        )
+
+    logger.debug("Runtime : %.2f seconds." % (time.time() - temps_debut))
+
+
+def get_chart_page_infos_reference(source: str):
+    soup = BeautifulSoup(source, "lxml")
+    if not soup.find("sections", {"id": "page_sections_charts"}):
+        return [], False
+    table = soup.find("section", {"id": "page_charts_section_charts"})
+    rows = table.find_all("div", {"class": "page_section_charts_item_wrapper"})
+    if len(rows) == 0:
+        return [], False
+    list_rows = [
+        get_chart_row_infos_reference(row) for row in rows if not row.find("script")
+    ]
+    has_next_page = bool(soup.find("a", {"class": "ui_pagination_next"}))
+    return list_rows, has_next_page
+
+
+def get_chart_row_infos_reference(row: element.Tag) -> dict:
+    """get_chart_row_infos before the single traversal version."""
+    dict_row = {}
+    try:
+        dict_row["Rank"] = row.get("id").replace("pos", "")
+    except Exception as e:
+        logger.debug("Error when fetching Rank: %s", e)
+        dict_row["Rank"] = "NA"
+    try:
+        artist_div = dict_row["Artist"] = row.find(
+            "div",
+            {"class": "page_charts_section_charts_item_credited_links_primary"},
+        )
+        romanized_version_span = artist_div.find(
+            "span", {"class": "ui_name_locale_language"}
+        )
+
+        original_name_span = artist_div.find(
+            "span", {"class": "ui_name_locale_original"}
+        )
+
+        if romanized_version_span:
+            dict_row[
+                "Artist"
+            ] = f"{romanized_version_span.text} [{original_name_span.text}]"
+        elif original_name_span:
+            dict_row["Artist"] = original_name_span.text
+        else:
+            dict_row["Artist"] = artist_div.text
+
+        dict_row["Artist"] = dict_row["Artist"].replace("\n", "")
+    except Exception as e:
+        logger.debug("Error when fetching Artist: %s", e)
+        dict_row["Artist"] = "NA"
+    try:
+        dict_row["Album"] = row.find(
+            "div",
+            {"class": "page_charts_section_charts_item_title"},
+        ).text.replace("\n", "")
+        logger.debug(
+            "%s - %s - %s",
+            dict_row["Rank"],
+            dict_row["Artist"],
+            dict_row["Album"],
+        )
+    except Exception as e:
+        logger.debug("Error when fetching Album: %s", e)
+        dict_row["Album"] = "NA"
+    try:
+        dict_row["Date"] = (
+            row.find("div", {"class": "page_charts_section_charts_item_date"})
+            .find_all("span")[0]
+            .text.replace("\n", "")
+            .strip()
+        )
+    except Exception as e:
+        logger.debug("Error when fetching Date: %s", e)
+        dict_row["Date"] = "NA"
+    try:
+        dict_row["Genres"] = ", ".join(
+            [
+                x.text
+                for x in row.find(
+                    "div", {"class": "page_charts_section_charts_item_genres_primary"}
+                ).find_all("a", {"class": "genre"})
+            ]
+        )
+    except Exception as e:
+        logger.debug("Error when fetching Genres: %s", e)
+        dict_row["Genres"] = "NA"
+    try:
+        dict_row["RYM Rating"] = row.find(
+            "span", {"class": "page_charts_section_charts_item_details_average_num"}
+        ).text
+    except Exception as e:
+        logger.debug("Error when fetching RYM Rating: %s", e)
+        dict_row["RYM Rating"] = "NA"
+    try:
+        dict_row["Ratings"] = (
+            row.find_all("span", {"class": "full"})[0]
+            .text.replace("\n", "")
+            .replace(" ", "")
+        )
+    except Exception as e:
+        logger.debug("Error when fetching Ratings: %s", e)
+        dict_row["Ratings"] = "NA"
+    try:
+        dict_row["Reviews"] = (
+            row.find_all("span", {"class": "full"})[1]
+            .text.replace("\n", "")
+            .replace(" ", "")
+        )
+    except Exception as e:
+        logger.debug("Error when fetching Reviews: %s", e)
+        dict_row["Reviews"] = "NA"
+    return dict_row
+
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark of the chart parsers on saved chart pages."
+    )
+    parser.add_argument(
+        "--debug",
+        help="Display debugging information.",
+        action="store_const",
+        dest="loglevel",
+        const=logging.DEBUG,
+        default=logging.INFO,
+    )
+    parser.add_argument("files", nargs="*", help="Saved html chart pages.")
+    parser.add_argument(
+        "-r", "--repeat", help="Number of runs per page.", type=int, default=5
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.loglevel)
+    # the parsers log every missing field
+    logging.getLogger("rymscraper").setLevel(logging.CRITICAL)
+    return args
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import logging
+import pytest
+from bs4 import BeautifulSoup
+
+
+class FixtureBrowser:
+    """Browser serving html pages from memory instead of rateyourmusic."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.source = None
+
+    def get_url(self, url, use_cache=True, interactive=False):
+        self.source = self.pages[url]
+
+    def get_page_source(self):
+        return self.source
+
+    def get_soup(self):
+        return BeautifulSoup(self.source, "lxml")
+
+
+@pytest.fixture(autouse=True)
+def quiet_parsers():
+    # the parsers log every missing field
+    logging.getLogger("rymscraper").setLevel(logging.CRITICAL)
+    yield
+    logging.getLogger("rymscraper").setLevel(logging.NOTSET)
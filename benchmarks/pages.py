@@ -0,0 +1,196 @@
+"""Html pages used by the parser benchmarks.
+
+Pages are generated with the structure read by the parsers of
+rymscraper.utils, in several sizes. Pages recorded from rateyourmusic can be
+added in benchmarks/pages/<page type>/*.html (for example with
+export_cache_pages) and are benchmarked along the generated ones.
+"""
+import glob
+import os
+from typing import List, Tuple
+
+PAGES_DIRECTORY = os.path.join(os.path.dirname(__file__), "pages")
+PAGE_TYPES = ["album", "artist", "chart", "discography", "release"]
+# number of rows, tracks or releases of the generated pages, by size
+SIZES = {"small": 10, "medium": 100, "large": 1000}
+
+# content surrounding the parsed sections of a real page
+PAGE_NOISE = "".join(
+    f'<script>var ad_{i} = {{"slot": {i}}};</script>'
+    f'<div class="ad_wrapper"><p>Advertisement {i}</p><img src="/ad/{i}.png"></div>'
+    for i in range(200)
+)
+
+
+def make_page(title: str, body: str) -> str:
+    return (
+        f"<!DOCTYPE html><html><head><title>{title}</title>"
+        f'<link rel="stylesheet" href="/style.css"></head><body>'
+        f"{PAGE_NOISE}{body}{PAGE_NOISE}</body></html>"
+    )
+
+
+def make_chart_page(size: int, page: int = 1, next_page: bool = True) -> str:
+    rows = []
+    for rank in range((page - 1) * size + 1, page * size + 1):
+        if rank % 3 == 0:
+            artist = (
+                f'<span class="ui_name_locale_language">Romanized {rank}</span>'
+                f'<span class="ui_name_locale_original">Original {rank}</span>'
+            )
+        else:
+            artist = f'<span class="ui_name_locale_original">Artist {rank}</span>'
+        rows.append(
+            f'<div class="page_section_charts_item_wrapper anchor" id="pos{rank}">'
+            f'<div class="page_charts_section_charts_item_credited_links_primary">'
+            f'<a class="artist" href="/artist/artist-{rank}">{artist}</a></div>\n'
+            f'<div class="page_charts_section_charts_item_title">'
+            f'<a class="release" href="/release/album/artist-{rank}/album-{rank}/">'
+            f'<span class="ui_name_locale_original">Album {rank} &amp; Co</span></a>\n</div>'
+            f'<div class="page_charts_section_charts_item_date"><span>15 March 2015</span>'
+            f"<span>Album</span></div>"
+            f'<div class="page_charts_section_charts_item_genres_primary">'
+            f'<a class="genre" href="/genre/jazz-rap/">Jazz Rap</a>, '
+            f'<a class="genre" href="/genre/conscious-hip-hop/">Conscious Hip Hop</a></div>'
+            f'<div class="page_charts_section_charts_item_details">'
+            f'<span class="page_charts_section_charts_item_details_average_num">'
+            f"{4 - rank / 10000:.2f}</span>"
+            f'<span class="page_charts_section_charts_item_details_ratings">'
+            f'<span class="full">{100000 - rank}</span></span>'
+            f'<span class="page_charts_section_charts_item_details_reviews">'
+            f'<span class="full">{1000 - rank % 1000}</span></span></div></div>'
+        )
+        if rank % 10 == 0:
+            rows.append(
+                '<div class="page_section_charts_item_wrapper">'
+                "<script>show_ad();</script></div>"
+            )
+    pagination = (
+        f'<a class="ui_pagination_next" href="/charts/top/album/all-time/{page + 1}/">'
+        "Next</a>"
+        if next_page
+        else ""
+    )
+    body = (
+        '<sections id="page_sections_charts">'
+        f'<section id="page_charts_section_charts">{"".join(rows)}</section>'
+        f"</sections>{pagination}"
+    )
+    return make_page("Top albums of all-time", body)
+
+
+def make_album_info_table(index: int) -> str:
+    infos = [
+        ("Type", "Album"),
+        ("Released", "22 June 2015"),
+        ("RYM Rating", "3.61 / 5.0 from 7,890 ratings"),
+        ("Ranked", f"#{index} for 2015, #{index * 10} overall"),
+        ("Genres", "Art Pop, Progressive Pop\nIndietronica, New Wave"),
+        ("Descriptors", "anxious, energetic, playful, conscious"),
+        ("Language", "English"),
+        ("Share", ""),
+    ]
+    return '<table class="album_info">' + "".join(
+        f"<tr><th>{k}</th><td>\n{v}\n</td></tr>" for k, v in infos
+    ) + "</table>"
+
+
+def make_album_page(size: int) -> str:
+    tracks = "".join(
+        f'<li class="track"><span class="tracklist_num">{i}</span>'
+        f'<span class="tracklist_title"><span class="rendered_text">Track {i}</span>'
+        f"</span></li>"
+        for i in range(1, size + 1)
+    )
+    colors = "".join(
+        f'<td style="background:#{i:06x};"></td>' for i in range(0, 900000, 100000)
+    )
+    body = (
+        '<div class="album_title">Get to Heaven\n \nBy Everything Everything</div>'
+        f"{make_album_info_table(1)}"
+        f'<ul id="tracks">{tracks}</ul>'
+        f'<table class="color_bar"><tr>{colors}</tr></table>'
+    )
+    return make_page("Get to Heaven", body)
+
+
+def make_artist_page(size: int) -> str:
+    members = ", ".join(f"Member {i} (vocals, guitar)" for i in range(size))
+    infos = [
+        ("Formed", "January 1998, San Diego, CA, United States"),
+        ("Members", members),
+        ("Genres", "Indie Rock, Indie Pop, Art Rock"),
+        ("Share", ""),
+    ]
+    info = "".join(
+        f'<div class="info_hdr">{k}</div><div class="info_content">{v}</div>'
+        for k, v in infos
+    )
+    body = (
+        '<h1 class="artist_name_hdr">Pinback</h1>'
+        f'<div class="artist_info">{info}</div>'
+        '<span class="label_num_followers">12,345 followers</span>'
+    )
+    return make_page("Pinback", body)
+
+
+def make_discography_page(size: int) -> str:
+    sections = []
+    for category, letter in [("Album", "s"), ("EP", "e"), ("Single", "i")]:
+        releases = "".join(
+            f'<div class="disco_release"><div class="disco_mainline">'
+            f'<a class="album" href="/release/album/pinback/{letter}{i}/">'
+            f"{category} {i}</a></div>"
+            f'<span class="disco_year_y" title="{i % 28 + 1} March 2015">2015</span>'
+            f'<div class="disco_avg_rating">3.{i % 10}5</div>'
+            f'<div class="disco_ratings">{i},234</div>'
+            f'<div class="disco_reviews">{i}</div></div>'
+            for i in range(size // 3 or 1)
+        )
+        sections.append(
+            f'<div class="disco_header_top"><h3>{category}</h3></div>'
+            f'<div id="disco_type_{letter}">{releases}</div>'
+        )
+    body = (
+        '<h1 class="artist_name_hdr">Pinback</h1>'
+        f'<div id="discography">{"".join(sections)}</div>'
+    )
+    return make_page("Pinback discography", body)
+
+
+def make_release_page(size: int) -> str:
+    return make_album_page(size)
+
+
+GENERATORS = {
+    "album": make_album_page,
+    "artist": make_artist_page,
+    "chart": make_chart_page,
+    "discography": make_discography_page,
+    "release": make_release_page,
+}
+
+
+def get_corpus(page_type: str) -> List[Tuple[str, str]]:
+    """Returns the (name, html) of the generated and recorded pages of a type."""
+    corpus = [
+        (f"{size_name}", GENERATORS[page_type](size))
+        for size_name, size in SIZES.items()
+    ]
+    for path in sorted(glob.glob(os.path.join(PAGES_DIRECTORY, page_type, "*.html"))):
+        with open(path, encoding="utf-8") as f:
+            corpus.append((os.path.basename(path), f.read()))
+    return corpus
+
+
+def export_cache_pages(cache, urls: List[str], page_type: str):
+    """Copies the pages of urls stored in a RymCache to the recorded pages."""
+    directory = os.path.join(PAGES_DIRECTORY, page_type)
+    os.makedirs(directory, exist_ok=True)
+    for url in urls:
+        html = cache.get(url) or cache.get(url, "interactive")
+        if html is None:
+            continue
+        name = cache.get_key(url)[:16]
+        with open(os.path.join(directory, f"{name}.html"), "w", encoding="utf-8") as f:
+            f.write(html)
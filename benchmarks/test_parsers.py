@@ -0,0 +1,98 @@
+"""Benchmarks of the parsers of rymscraper.utils on recorded html pages.
+
+Run with: pytest benchmarks --benchmark-only
+Time is measured by pytest-benchmark, peak memory by tracemalloc and stored
+in the extra_info of each benchmark.
+"""
+import tracemalloc
+import pytest
+from bs4 import BeautifulSoup
+from rymscraper import utils
+from benchmarks import pages
+from benchmarks.conftest import FixtureBrowser
+
+pytest.importorskip("pytest_benchmark")
+
+
+def get_params(page_type):
+    return [pytest.param(n, s, id=n) for n, s in pages.get_corpus(page_type)]
+
+
+def run_benchmark(benchmark, function, *args):
+    """Benchmarks function and records its peak memory in bytes."""
+    tracemalloc.start()
+    function(*args)
+    benchmark.extra_info["peak_memory"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return benchmark(function, *args)
+
+
+def parse_album(source):
+    return utils.get_album_infos(BeautifulSoup(source, "lxml"))
+
+
+def parse_artist(source):
+    return utils.get_artist_infos(BeautifulSoup(source, "lxml"))
+
+
+def parse_chart(source, parser="lxml"):
+    return utils.get_chart_page_infos(source, parser=parser)
+
+
+def parse_discography(source):
+    return utils.get_artist_disco(None, BeautifulSoup(source, "lxml"), False)
+
+
+def parse_release(source):
+    browser = FixtureBrowser({"release_url": source})
+    return utils.get_complementary_infos_disc(browser, {"Year": "2015"}, "release_url")
+
+
+@pytest.mark.parametrize("name,source", get_params("album"))
+def test_album_infos(benchmark, name, source):
+    benchmark.group = "album"
+    album_infos = run_benchmark(benchmark, parse_album, source)
+    if not album_infos["Track listing"]:
+        raise AssertionError()
+
+
+@pytest.mark.parametrize("name,source", get_params("artist"))
+def test_artist_infos(benchmark, name, source):
+    benchmark.group = "artist"
+    artist_infos = run_benchmark(benchmark, parse_artist, source)
+    if not artist_infos["Name"]:
+        raise AssertionError()
+
+
+@pytest.mark.parametrize("name,source", get_params("chart"))
+def test_chart_infos(benchmark, name, source):
+    benchmark.group = "chart"
+    rows, _ = run_benchmark(benchmark, parse_chart, source)
+    if not rows or rows[0]["Rank"] == "NA":
+        raise AssertionError()
+
+
+@pytest.mark.parametrize("name,source", get_params("chart"))
+def test_chart_infos_selectolax(benchmark, name, source):
+    if utils.HTMLParser is None:
+        pytest.skip("selectolax not installed")
+    benchmark.group = "chart"
+    chart_infos = run_benchmark(benchmark, parse_chart, source, "selectolax")
+    if chart_infos != parse_chart(source):
+        raise AssertionError()
+
+
+@pytest.mark.parametrize("name,source", get_params("discography"))
+def test_artist_disco(benchmark, name, source):
+    benchmark.group = "discography"
+    artist_disco = run_benchmark(benchmark, parse_discography, source)
+    if not artist_disco:
+        raise AssertionError()
+
+
+@pytest.mark.parametrize("name,source", get_params("release"))
+def test_complementary_infos_disc(benchmark, name, source):
+    benchmark.group = "release"
+    dict_disc = run_benchmark(benchmark, parse_release, source)
+    if "Rank Year" not in dict_disc:
+        raise AssertionError()
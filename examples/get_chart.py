@@ -1,9 +1,8 @@
 import logging
 import time
 import argparse
-import pandas as pd
 from pathlib import Path
-from rymscraper import rymscraper, RymUrl
+from rymscraper import rymscraper, RymExport, RymUrl
 
 logger = logging.getLogger()
 logging.getLogger("urllib3").setLevel(logging.WARNING)
@@ -36,31 +35,21 @@ def main():
         if args.country:
             export_filename += f"_{args.country}"
     else:
-        url = args.url
+        url = RymUrl.RymUrl.from_url(args.url)
         export_filename = f"{export_directory}/{int(time.time())}_export_url"
 
     logger.debug("completed rym_url : %s.", url)
 
     RymNetwork = rymscraper.RymNetwork(headless=args.no_headless)
 
-    logger.info("Extracting infos from the chart.")
-    list_rows = RymNetwork.get_chart_infos(url, max_page=args.page)
-
-    columns = [
-        "Rank",
-        "Artist",
-        "Album",
-        "Date",
-        "Genres",
-        "RYM Rating",
-        "Ratings",
-        "Reviews",
-    ]
-
-    df = pd.DataFrame(list_rows)
-    df = df[columns]
-    logger.info("Exporting results to %s.", export_filename + ".csv")
-    df.to_csv(export_filename + ".csv", sep="\t", index=False)
+    # the rows are written by batches while the chart is extracted
+    export_filename += f".{args.format}"
+    logger.info("Extracting infos from the chart to %s.", export_filename)
+    RymExport.export(
+        RymNetwork.iter_chart_infos(url, max_page=args.page, typed=True),
+        export_filename,
+        "chart",
+    )
 
     RymNetwork.browser.close()
     RymNetwork.browser.quit()
@@ -105,6 +94,14 @@ def parse_args():
         help="Number of page to extract. If not set, every pages will be extracted.",
         type=int,
     )
+    parser.add_argument(
+        "-f",
+        "--format",
+        help="Export format : csv (tab-separated, default), parquet or arrow (needs pyarrow).",
+        type=str,
+        choices=["csv", "parquet", "arrow"],
+        default="csv",
+    )
     parser.add_argument(
         "-e",
         "--everything",
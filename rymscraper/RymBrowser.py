@@ -1,70 +1,418 @@
+import contextvars
+import json
 import logging
+import os
+import re
+import threading
 import time
 from bs4 import BeautifulSoup
 from selenium import webdriver
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 from selenium.webdriver.firefox.options import Options
 from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from . import RymCache, RymFetcher, RymMetrics, RymScheduler
 
 logger = logging.getLogger(__name__)
 
+IP_BLOCKED_TITLE = re.compile(r"<title>\s*IP blocked\s*</title>", re.IGNORECASE)
+SEC_VERIFY_FORM = re.compile(r"<form[^>]*\bid=[\"']?sec_verify\b")
+# firefox preferences of the scrape profile: only the html and scripts
+# needed by the pages are loaded
+SCRAPE_PROFILE_PREFERENCES = {
+    "permissions.default.image": 2,
+    "gfx.downloadable_fonts.enabled": False,
+    "media.autoplay.default": 5,
+    "media.autoplay.blocking_policy": 2,
+    "media.mediasource.enabled": False,
+    "media.hardware-video-decoding.enabled": False,
+    # ads, analytics and social trackers of the firefox block lists
+    "privacy.trackingprotection.enabled": True,
+    "privacy.trackingprotection.socialtracking.enabled": True,
+    "privacy.trackingprotection.cryptomining.enabled": True,
+    "privacy.trackingprotection.fingerprinting.enabled": True,
+    "browser.cache.disk.enable": False,
+    "browser.cache.memory.enable": True,
+    "browser.sessionstore.resume_from_crash": False,
+    "browser.sessionhistory.max_total_viewers": 0,
+    "network.prefetch-next": False,
+    "network.dns.disablePrefetch": True,
+    "network.http.speculative-parallel-limit": 0,
+    "datareporting.healthreport.uploadEnabled": False,
+    "datareporting.policy.dataSubmissionEnabled": False,
+    "toolkit.telemetry.enabled": False,
+    "app.update.enabled": False,
+}
+# page of the website loaded to restore a session, cookies and local storage
+# can only be set on their domain
+SESSION_URL = "https://rateyourmusic.com/robots.txt"
+# the session files can be shared by several browsers
+_session_lock = threading.Lock()
+# number of requests and bytes transferred by the current page
+PAGE_BYTES_SCRIPT = (
+    "const entries = performance.getEntriesByType('navigation')"
+    ".concat(performance.getEntriesByType('resource'));"
+    "return [entries.length,"
+    " entries.reduce((total, x) => total + (x.transferSize || 0), 0)];"
+)
+# no page load nor ajax request running
+NETWORK_IDLE_SCRIPT = (
+    "return document.readyState === 'complete'"
+    " && (!window.jQuery || window.jQuery.active === 0);"
+)
+
+
+# threading.Event set when the coroutine of AsyncRymNetwork running the
+# current extraction is cancelled, checked before every page load
+cancel_event = contextvars.ContextVar("cancel_event", default=None)
+
+
+def is_cancelled() -> bool:
+    """Returns True if the current extraction was cancelled."""
+    event = cancel_event.get()
+    return event is not None and event.is_set()
+
+
+def check_cancelled():
+    if is_cancelled():
+        raise Exception("Extraction cancelled. Exiting.")
+
+
+def is_stale(element) -> bool:
+    """Returns True if a selenium element was removed from the page."""
+    try:
+        element.is_enabled()
+        return False
+    except StaleElementReferenceException:
+        return True
+
 
 class RymBrowser(webdriver.Firefox):
-    def __init__(self, headless=True):
+    def __init__(
+        self,
+        headless=True,
+        scheduler=None,
+        cache=None,
+        fetcher=None,
+        wait_timeout=30,
+        poll_frequency=0.05,
+        scrape_profile=False,
+        profile_dir=None,
+        session=None,
+        metrics=None,
+    ):
         logger.debug("Starting Selenium Browser : headless = %s", headless)
         self.options = Options()
         if headless:
             self.options.add_argument('-headless')
+        if scrape_profile:
+            for name, value in SCRAPE_PROFILE_PREFERENCES.items():
+                self.options.set_preference(name, value)
+        # firefox profile kept between the sessions instead of a blank one
+        self.profile_dir = profile_dir
+        if profile_dir:
+            os.makedirs(profile_dir, exist_ok=True)
+            self.options.add_argument("-profile")
+            self.options.add_argument(profile_dir)
+        # path of the JSON file storing the cookies, local storage and consent
+        self.session = session
+        # the consent popups were already accepted
+        self.consent = False
+        # no rate limit by default, only the retries of rate-limited pages
+        self.scheduler = scheduler or RymScheduler.RymScheduler()
+        self.metrics = metrics or RymMetrics.RymMetrics()
+        # type of the current page, tag of the metrics
+        self.page_type = "other"
+        self.cache = cache
+        # backend used for the static pages, firefox is used if None
+        self.fetcher = fetcher
+        # html of the current page when it doesn't come from firefox
+        self.source = None
+        # parsed version of the current page
+        self._soup = None
+        self._soup_source = None
+        # firefox is only launched for the first page missing from the cache
+        self.started = False
+        # max duration of the explicit waits (clicks, expanded sections)
+        self.wait_timeout = wait_timeout
+        self.poll_frequency = poll_frequency
+        # count, total duration and timeouts of the waits, by name
+        self.wait_stats = {}
+        # requests, bytes and load time of the last page downloaded
+        self.page_stats = None
+        # number, requests, bytes and load time of the pages, by page type
+        self.bytes_stats = {}
 
-        webdriver.Firefox.__init__(self, options=self.options)
+    def start(self):
+        with self.metrics.timer("start_seconds"):
+            webdriver.Firefox.__init__(self, options=self.options)
+        self.metrics.emit("starts")
+        self.started = True
+        # the popups of a new firefox are accepted again, unless the consent
+        # is restored with the session
+        self.consent = False
+        if self.session:
+            self.restore_session()
 
     def restart(self):
+        """Launches a new firefox, after the retries of a rate-limited page."""
+        self.metrics.emit("restarts", self.page_type)
         self.quit()
-        webdriver.Firefox.__init__(self, options=self.options)
+        self.start()
+
+    def close(self):
+        if self.started:
+            self.save_session()
+            webdriver.Firefox.close(self)
+
+    def quit(self):
+        if self.started:
+            self.save_session()
+            webdriver.Firefox.quit(self)
+            self.started = False
+
+    def save_session(self):
+        """Saves the cookies, local storage and consent of the website to the
+        session file."""
+        if not self.session or not self.started:
+            return
+        try:
+            data = {
+                "cookies": self.get_cookies(),
+                "local_storage": self.execute_script(
+                    "return Object.assign({}, window.localStorage);"
+                ),
+                "consent": self.consent,
+            }
+        except Exception as e:
+            logger.warning("Session not saved : %s.", e)
+            return
+        with _session_lock:
+            with open(self.session, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        logger.debug("Session saved to %s.", self.session)
+
+    def restore_session(self):
+        """Restores the cookies, local storage and consent of the website from
+        the session file."""
+        with _session_lock:
+            if not os.path.exists(self.session):
+                return
+            with open(self.session, encoding="utf-8") as f:
+                data = json.load(f)
+        self.scheduler.wait()
+        self.get(SESSION_URL)
+        for cookie in data["cookies"]:
+            try:
+                self.add_cookie(cookie)
+            except Exception as e:
+                logger.debug("Cookie %s not restored : %s.", cookie.get("name"), e)
+        self.execute_script(
+            "for (const [key, value] of Object.entries(arguments[0]))"
+            " window.localStorage.setItem(key, value);",
+            data["local_storage"],
+        )
+        self.consent = data["consent"]
+        logger.debug("Session restored from %s.", self.session)
+
+    def get_url(self, url, use_cache=True, interactive=False, page_type=None):
+        """Loads an url.
+
+        Parameters:
+            url: Url of the page.
+            use_cache: Read and store the page in the cache, if any.
+            interactive: The page needs a live selenium browser (expanded
+            sections, clicks) and can't be downloaded by the fetcher.
+            page_type: Tag of the metrics of the page, guessed from the url
+            if None.
 
-    def get_url(self, url):
+        """
         logger.debug("get_url(browser, %s)", url)
-        while True:
-            self.get(str(url))
-            class_to_click_on = [
-                "as-oil__btn-optin",  # cookie bar
-                "fc-cta-consent",  # consent popup
-                # "ad-close-button",  # advertisement banner
-            ]
-            for i in class_to_click_on:
-                if len(self.find_elements(By.CLASS_NAME, i)) > 0:
-                    self.find_element(By.CLASS_NAME, i).click()
-                    logger.debug(f"{i} found. Clicking on it.")
-
-            if len(self.find_elements(By.CLASS_NAME, "disco_expand_section_link")) > 0:
-                try:
-                    for index, link in enumerate(
-                        self.find_elements(By.CLASS_NAME, "disco_expand_section_link")
-                    ):
-                        self.execute_script(
-                            f"document.getElementsByClassName('disco_expand_section_link')[{index}].scrollIntoView(true);"
-                        )
-                        link.click()
-                        time.sleep(0.2)
-                except Exception as e:
-                    logger.debug('No "Show all" links found : %s.', e)
+        self.page_type = page_type or RymCache.get_page_type(str(url))
+        # expanded pages don't share the cache entry of the static ones
+        variant = "interactive" if interactive else ""
+        if use_cache and self.cache:
+            self.source = self.cache.get(url, variant)
+            if self.source is not None:
+                self.metrics.emit("cache_hits", self.page_type)
+                return
+        if self.cache and self.cache.offline:
+            raise Exception(f"{url} not in the cache and offline mode enabled.")
+        for attempt in range(self.scheduler.max_retries + 1):
+            check_cancelled()
+            if attempt:
+                self.metrics.emit("retries", self.page_type)
+            self.metrics.emit("wait_seconds", self.page_type, self.scheduler.wait())
+            start = time.monotonic()
+            if self.fetcher and not interactive:
+                self.source, size, status = self.fetcher.fetch_page(url)
+                requests = 1
+            else:
+                self.source = None
+                self.navigate(url)
+                requests, size = self.execute_script(PAGE_BYTES_SCRIPT)
+                status = None
+            self.record_page(url, requests, size, time.monotonic() - start)
+            source = self.get_page_source()
             # Test if IP is banned.
-            if self.is_ip_banned():
+            if self.is_ip_banned(source):
                 self.quit()
                 raise Exception("IP banned from rym. Can't do any requests to the website. Exiting.")
             # Test if browser is rate-limited.
-            if self.is_rate_limited():
-                logger.error("Rate-limit detected. Restarting browser.")
-                self.restart()
-            else:
+            rate_limited = (
+                status in RymFetcher.RATE_LIMIT_STATUSES or self.is_rate_limited(source)
+            )
+            if not rate_limited:
                 break
+            logger.error("Rate-limit detected for %s (attempt %s).", url, attempt + 1)
+            self.metrics.emit("rate_limits", self.page_type)
+            self.scheduler.on_rate_limited()
+            if attempt < self.scheduler.max_retries:
+                self.metrics.emit(
+                    "backoff_seconds", self.page_type, self.scheduler.backoff(attempt)
+                )
+        else:
+            # the next pages are loaded by a new firefox
+            if self.started:
+                self.restart()
+            raise Exception(f"Still rate-limited after {attempt + 1} attempts. Exiting.")
+        # error pages are never cached
+        if status is not None and not 200 <= status < 300:
+            raise Exception(f"HTTP error {status} for {url}. Exiting.")
+        self.scheduler.on_success()
+        if use_cache and self.cache:
+            self.cache.set(url, source, variant)
         return
 
+    def navigate(self, url):
+        """Loads an url in firefox, accepts the popups and expands the sections."""
+        if not self.started:
+            self.start()
+        self.get(str(url))
+        class_to_click_on = [
+            "as-oil__btn-optin",  # cookie bar
+            "fc-cta-consent",  # consent popup
+            # "ad-close-button",  # advertisement banner
+        ]
+        # the consent is kept in the cookies of the session
+        for i in class_to_click_on if not self.consent else []:
+            if len(self.find_elements(By.CLASS_NAME, i)) > 0:
+                self.find_element(By.CLASS_NAME, i).click()
+                logger.debug(f"{i} found. Clicking on it.")
+                self.consent = True
+
+        if len(self.find_elements(By.CLASS_NAME, "disco_expand_section_link")) > 0:
+            try:
+                for index, link in enumerate(
+                    self.find_elements(By.CLASS_NAME, "disco_expand_section_link")
+                ):
+                    self.execute_script(
+                        f"document.getElementsByClassName('disco_expand_section_link')[{index}].scrollIntoView(true);"
+                    )
+                    # the section is reloaded with all its releases
+                    self.click_and_wait(
+                        link, watched=link.find_element(By.XPATH, ".."), name="expand"
+                    )
+                self.wait_for_network_idle(name="expand")
+            except TimeoutException:
+                logger.warning('"Show all" sections of %s not loaded.', url)
+            except Exception as e:
+                logger.debug('No "Show all" links found : %s.', e)
+
+    def record_page(self, url, requests, size, load_time):
+        """Records the requests, bytes and load time of a downloaded page.
+
+        The bytes of the pages loaded by firefox are the transfer sizes
+        reported by the performance api, the resources of other domains
+        without timing headers count as 0.
+        """
+        self.page_stats = {
+            "url": str(url),
+            "page_type": self.page_type,
+            "requests": requests,
+            "bytes": size,
+            "time": load_time,
+        }
+        stats = self.bytes_stats.setdefault(
+            self.page_stats["page_type"],
+            {"pages": 0, "requests": 0, "bytes": 0, "time": 0.0},
+        )
+        stats["pages"] += 1
+        stats["requests"] += requests
+        stats["bytes"] += size
+        stats["time"] += load_time
+        self.metrics.emit("requests", self.page_type)
+        self.metrics.emit("bytes", self.page_type, size)
+        self.metrics.emit("navigation_seconds", self.page_type, load_time, url=str(url))
+        logger.debug("%s : %s requests, %s bytes.", url, requests, size)
+
+    def wait_until(self, condition, timeout=None, name="wait"):
+        """Waits until condition(browser) returns a true value, and returns it.
+
+        Parameters:
+            condition: Function called with the browser every poll_frequency
+            seconds. Stale elements are considered as a false value.
+            timeout: Max duration of the wait in seconds, wait_timeout by
+            default. Raises a TimeoutException when reached.
+            name: Name of the wait in wait_stats.
+
+        """
+        stats = self.wait_stats.setdefault(name, {"count": 0, "time": 0.0, "timeouts": 0})
+        start = time.monotonic()
+        try:
+            return WebDriverWait(
+                self,
+                timeout or self.wait_timeout,
+                poll_frequency=self.poll_frequency,
+                ignored_exceptions=[StaleElementReferenceException],
+            ).until(condition)
+        except TimeoutException:
+            stats["timeouts"] += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            stats["count"] += 1
+            stats["time"] += elapsed
+            self.metrics.emit("wait_seconds", self.page_type, elapsed, name=name)
+
+    def click_and_wait(self, element, watched=None, timeout=None, name="click"):
+        """Clicks on an element and waits until watched (the element by
+        default) is removed from the page or its content changes."""
+        check_cancelled()
+        watched = watched or element
+        content = watched.get_attribute("innerHTML")
+        element.click()
+        self.wait_until(
+            lambda x: is_stale(watched) or watched.get_attribute("innerHTML") != content,
+            timeout,
+            name,
+        )
+
+    def wait_for_network_idle(self, timeout=None, name="network_idle"):
+        """Waits until the page and its ajax requests are loaded."""
+        self.wait_until(lambda x: x.execute_script(NETWORK_IDLE_SCRIPT), timeout, name)
+
+    def get_page_source(self):
+        if self.source is not None:
+            return self.source
+        return self.page_source
+
     def get_soup(self):
-        return BeautifulSoup(self.page_source, "lxml")
+        """Returns the parsed current page.
+
+        The page is only parsed again when its source changes (navigation,
+        clicks), so the soup must not be modified by the callers.
+        """
+        source = self.get_page_source()
+        if self._soup is None or source != self._soup_source:
+            self._soup = BeautifulSoup(source, "lxml")
+            self._soup_source = source
+        return self._soup
 
-    def is_ip_banned(self):
-        logger.debug("soup.title : %s", self.get_soup().title)
-        return self.get_soup().title.text.strip() == "IP blocked"
+    def is_ip_banned(self, source=None):
+        source = source if source is not None else self.get_page_source()
+        return bool(IP_BLOCKED_TITLE.search(source))
 
-    def is_rate_limited(self):
-        return self.get_soup().find("form", {"id": "sec_verify"})
+    def is_rate_limited(self, source=None):
+        source = source if source is not None else self.get_page_source()
+        return bool(SEC_VERIFY_FORM.search(source))
@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from . import RymUrl
+
+logger = logging.getLogger(__name__)
+
+# Time to live of the cached pages in seconds, by page type.
+DEFAULT_TTLS = {
+    "chart": 24 * 3600,
+    "search": 7 * 24 * 3600,
+    "artist": 7 * 24 * 3600,
+    "release": 30 * 24 * 3600,
+    "other": 24 * 3600,
+}
+
+
+def get_page_type(url: str) -> str:
+    """Returns the type of a rateyourmusic page (chart, release, artist, search or other)."""
+    path = urlsplit(str(url)).path
+    for prefix, page_type in [
+        ("/charts/", "chart"),
+        ("/release/", "release"),
+        ("/artist/", "artist"),
+        ("/search", "search"),
+    ]:
+        if path.startswith(prefix):
+            return page_type
+    return "other"
+
+
+def normalize_url(url: str) -> str:
+    """Returns a normalized version of an url, used as the cache key. The
+    chart urls are replaced by their canonical RymUrl."""
+    if get_page_type(url) == "chart":
+        try:
+            return str(RymUrl.RymUrl.from_url(url))
+        except Exception:
+            pass
+    parts = urlsplit(str(url).strip())
+    path = parts.path.rstrip("/") + "/"
+    query = urlencode(sorted(parse_qsl(parts.query)))
+    return urlunsplit(("https", parts.netloc.lower(), path, query, ""))
+
+
+class RymCache:
+    """Persistent cache of the html pages downloaded from rateyourmusic.
+
+    Pages are stored compressed in a SQLite file, keyed by the hash of their
+    normalized url. Each page type has its own time to live and the least
+    recently used pages are evicted when the cache grows over max_size bytes.
+
+    With offline=True the time to live is ignored and pages missing from the
+    cache raise an exception instead of being downloaded.
+    """
+
+    def __init__(
+        self,
+        path: str = "rymscraper_cache.sqlite",
+        max_size: int = 1024**3,
+        ttls: Dict[str, float] = None,
+        offline: bool = False,
+    ):
+        self.path = path
+        self.max_size = max_size
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS pages (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    page_type TEXT,
+                    fetched_at REAL,
+                    accessed_at REAL,
+                    size INTEGER,
+                    content BLOB
+                )"""
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)"
+            )
+
+    @staticmethod
+    def get_key(url: str, variant: str = "") -> str:
+        key = normalize_url(url) + (f" {variant}" if variant else "")
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def get(self, url: str, variant: str = "") -> Optional[str]:
+        """Returns the cached html of an url, or None if absent or expired.
+
+        The variant distinguishes several renderings of the same url.
+        """
+        key = self.get_key(url, variant)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT page_type, fetched_at, content FROM pages WHERE key = ?",
+                (key,),
+            ).fetchone()
+            now = time.time()
+            if row and (self.offline or now - row[1] < self.ttls[row[0]]):
+                with self._connection:
+                    self._connection.execute(
+                        "UPDATE pages SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+                self.hits += 1
+                logger.debug("Cache hit for %s.", url)
+                return zlib.decompress(row[2]).decode("utf-8")
+            self.misses += 1
+            logger.debug("Cache miss for %s.", url)
+            return None
+
+    def set(self, url: str, html: str, variant: str = ""):
+        """Stores the html of an url and evicts the oldest pages if needed."""
+        content = zlib.compress(html.encode("utf-8"))
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    self.get_key(url, variant),
+                    normalize_url(url),
+                    get_page_type(url),
+                    now,
+                    now,
+                    len(content),
+                    content,
+                ),
+            )
+            self._evict()
+
+    def _evict(self):
+        total_size = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()[0]
+        if total_size <= self.max_size:
+            return
+        for key, size in self._connection.execute(
+            "SELECT key, size FROM pages ORDER BY accessed_at"
+        ).fetchall():
+            if total_size <= self.max_size:
+                break
+            self._connection.execute("DELETE FROM pages WHERE key = ?", (key,))
+            total_size -= size
+            logger.debug("Evicting page %s from the cache.", key)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the hit and miss counters of the cache."""
+        with self._lock:
+            pages, size = self._connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "pages": pages, "size": size}
+
+    def clear(self):
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM pages")
+
+    def close(self):
+        self._connection.close()
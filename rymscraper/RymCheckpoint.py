@@ -0,0 +1,77 @@
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class RymCheckpoint:
+    """Append-only JSONL record of the items extracted by batch jobs.
+
+    Each line stores the method, the key (url, name or chart page) and
+    either its parsed result or the error it raised. When the same file is
+    used again, finished items are read back instead of being extracted and
+    only the failed or missing ones are retried.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._results: Dict[Tuple[str, str], Any] = {}
+        self._failures: Dict[Tuple[str, str], str] = {}
+        if os.path.exists(path):
+            self._load()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # last line of an interrupted run
+                    logger.warning("Ignoring invalid checkpoint line : %s", line)
+                    continue
+                item = (record["method"], record["key"])
+                if record["ok"]:
+                    self._results[item] = record["result"]
+                    self._failures.pop(item, None)
+                else:
+                    self._failures[item] = record["error"]
+        logger.info(
+            "Checkpoint %s loaded : %s items done, %s failures.",
+            self.path,
+            len(self._results),
+            len(self._failures),
+        )
+
+    def _write(self, record: Dict):
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def is_done(self, method: str, key: str) -> bool:
+        return (method, key) in self._results
+
+    def get(self, method: str, key: str) -> Any:
+        return self._results[(method, key)]
+
+    def add(self, method: str, key: str, result: Any):
+        """Records the result of an item."""
+        self._results[(method, key)] = result
+        self._failures.pop((method, key), None)
+        self._write({"method": method, "key": key, "ok": True, "result": result})
+
+    def add_failure(self, method: str, key: str, error: str):
+        """Records an item that couldn't be extracted."""
+        self._failures[(method, key)] = error
+        self._write({"method": method, "key": key, "ok": False, "error": error})
+
+    def failures(self) -> List[Tuple[str, str, str]]:
+        """Returns the (method, key, error) of the items still failing."""
+        return [(m, k, e) for (m, k), e in self._failures.items()]
+
+    def close(self):
+        self._file.close()
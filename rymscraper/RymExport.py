@@ -0,0 +1,267 @@
+"""Export of the scraped records to Parquet, Arrow IPC and CSV files.
+
+The records are written by batches as they are scraped, with a typed
+schema by entity built from the RymRecords fields. The keys of the records
+without a typed field are exported as JSON in an "Extra" column.
+"""
+import csv
+import glob
+import json
+import logging
+import os
+from typing import Dict, Iterable, List, Tuple, Union
+from . import RymRecords
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+logger = logging.getLogger(__name__)
+
+RECORD_CLASSES = {
+    "chart": RymRecords.ChartRow,
+    "release": RymRecords.Release,
+    "album": RymRecords.Album,
+    "artist": RymRecords.Artist,
+    "timeline": RymRecords.CatalogEntry,
+}
+# entities with keys outside of the typed fields
+EXTRA_ENTITIES = {"release", "album", "artist"}
+FORMATS = {
+    ".parquet": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+    ".csv": "csv",
+    ".tsv": "csv",
+}
+
+
+def get_fields(entity: str) -> List[Tuple[str, str, str]]:
+    """Returns the (attribute, column, kind) of the exported fields of an
+    entity, the typed fields then the computed ones."""
+    record_class = RECORD_CLASSES[entity]
+    return record_class.fields + record_class.computed_fields
+
+
+def get_columns(entity: str) -> List[str]:
+    """Returns the exported columns of an entity."""
+    columns = [key for _, key, _ in get_fields(entity)]
+    if entity in EXTRA_ENTITIES:
+        columns.append("Extra")
+    return columns
+
+
+def get_schema(entity: str):
+    """Returns the pyarrow schema of an entity."""
+    if pyarrow is None:
+        raise Exception("pyarrow is needed for the parquet and arrow exports. Exiting.")
+    arrow_types = {
+        "str": pyarrow.string(),
+        "int": pyarrow.int64(),
+        "float": pyarrow.float64(),
+        "date": pyarrow.date32(),
+        "leading_date": pyarrow.date32(),
+        "genres": pyarrow.list_(pyarrow.string()),
+        "genre_lines": pyarrow.list_(pyarrow.list_(pyarrow.string())),
+        "rym_rating": pyarrow.string(),
+        "list": pyarrow.list_(pyarrow.string()),
+    }
+    fields = [
+        pyarrow.field(key, arrow_types[kind]) for _, key, kind in get_fields(entity)
+    ]
+    if entity in EXTRA_ENTITIES:
+        fields.append(pyarrow.field("Extra", pyarrow.string()))
+    return pyarrow.schema(fields)
+
+
+def get_part_path(path: str, part: int) -> str:
+    root, extension = os.path.splitext(path)
+    return f"{root}-{part:05d}{extension}"
+
+
+def get_parts(path: str) -> List[str]:
+    """Returns the files written to path, including the parts appended by
+    the next runs."""
+    root, extension = os.path.splitext(path)
+    parts = sorted(glob.glob(f"{glob.escape(root)}-[0-9][0-9][0-9][0-9][0-9]{extension}"))
+    return ([path] if os.path.exists(path) else []) + parts
+
+
+class RymExporter:
+    """Writes records to a Parquet, Arrow IPC or CSV file by batches.
+
+    Parquet and Arrow files can't be extended: with append, the records
+    are written to a new part file next to path (path-00001.parquet, ...),
+    all the parts being listed by get_parts and readable as one dataset
+    with pyarrow.dataset. CSV files are extended.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        entity: str = "chart",
+        file_format: str = None,
+        batch_size: int = 10000,
+        append: bool = False,
+        delimiter: str = "\t",
+    ):
+        """
+        Parameters:
+            path: Path of the exported file.
+            entity: Type of the records, "chart", "release", "album",
+            "artist" or "timeline".
+            file_format: "parquet", "arrow" or "csv". Guessed from the
+            extension of path if None.
+            batch_size: Number of records kept in memory before being written.
+            append: Keep the records of a previous export of path.
+            delimiter: Delimiter of the CSV files.
+
+        """
+        if entity not in RECORD_CLASSES:
+            raise Exception(f"Unknown entity {entity}. Exiting.")
+        self.file_format = file_format or FORMATS.get(
+            os.path.splitext(path)[1].lower()
+        )
+        if self.file_format not in ("parquet", "arrow", "csv"):
+            raise Exception(f"Unknown export format for {path}. Exiting.")
+        self.path = path
+        self.entity = entity
+        self.record_class = RECORD_CLASSES[entity]
+        self.fields = get_fields(entity)
+        self.columns = get_columns(entity)
+        self.schema = get_schema(entity) if self.file_format != "csv" else None
+        self.batch_size = batch_size
+        self.append = append
+        self.delimiter = delimiter
+        self.count = 0
+        self._batch = []
+        self._file = None
+        self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, record: Union[Dict, RymRecords.RymRecord]):
+        """Adds a record (dict or RymRecords record), None being ignored."""
+        if record is None:
+            return
+        if isinstance(record, dict):
+            record = self.record_class.from_dict(record)
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records: Iterable) -> int:
+        """Adds records from a list or iterator, returns the number written."""
+        count = self.count + len(self._batch)
+        for record in records:
+            self.write(record)
+        return self.count + len(self._batch) - count
+
+    def flush(self):
+        """Writes the records of the current batch."""
+        if self._writer is None:
+            self._open()
+        if not self._batch:
+            return
+        if self.file_format == "csv":
+            self._writer.writerows(self._get_csv_row(x) for x in self._batch)
+            self._file.flush()
+        else:
+            self._writer.write_batch(
+                pyarrow.RecordBatch.from_pydict(self._get_columns(), schema=self.schema)
+            )
+        self.count += len(self._batch)
+        logger.debug("%s records exported to %s.", self.count, self.path)
+        self._batch = []
+
+    def close(self):
+        self.flush()
+        if self.file_format != "csv":
+            self._writer.close()
+        else:
+            self._file.close()
+
+    def _open(self):
+        if self.file_format == "csv":
+            exists = self.append and os.path.exists(self.path) and os.path.getsize(self.path)
+            self._file = open(
+                self.path, "a" if self.append else "w", newline="", encoding="utf-8"
+            )
+            self._writer = csv.writer(self._file, delimiter=self.delimiter)
+            if not exists:
+                self._writer.writerow(self.columns)
+            return
+        parts = get_parts(self.path)
+        if self.append and parts:
+            # the number of a part is in its 5 characters before the extension
+            extension = os.path.splitext(self.path)[1]
+            numbers = [
+                int(x[-len(extension) - 5 : -len(extension)])
+                for x in parts
+                if x != self.path
+            ]
+            self.path = get_part_path(self.path, max(numbers, default=0) + 1)
+        else:
+            # parts of a previous export
+            for part in parts[1:] if parts and parts[0] == self.path else parts:
+                os.remove(part)
+        if self.file_format == "parquet":
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+        else:
+            self._writer = pyarrow.ipc.new_file(self.path, self.schema)
+
+    def _get_extra(self, record) -> str:
+        return json.dumps(record.extra, ensure_ascii=False) if record.extra else None
+
+    def _get_columns(self) -> Dict[str, List]:
+        columns = {}
+        for attribute, key, kind in self.fields:
+            values = [getattr(x, attribute) for x in self._batch]
+            if kind in ("genres", "list"):
+                values = [list(x) if x is not None else None for x in values]
+            elif kind == "genre_lines":
+                values = [
+                    [list(y) for y in x] if x is not None else None for x in values
+                ]
+            elif kind == "rym_rating":
+                values = [
+                    RymRecords.format_value(x, kind) if x is not None else None
+                    for x in values
+                ]
+            columns[key] = values
+        if self.entity in EXTRA_ENTITIES:
+            columns["Extra"] = [self._get_extra(x) for x in self._batch]
+        return columns
+
+    def _get_csv_row(self, record) -> List:
+        dict_record = record.to_dict()
+        values = [
+            dict_record.get(key, RymRecords.NA) for _, key, _ in self.record_class.fields
+        ]
+        # the computed fields aren't in to_dict
+        values += [
+            RymRecords.format_value(getattr(record, attribute), kind)
+            for attribute, _, kind in self.record_class.computed_fields
+        ]
+        row = [
+            json.dumps(x, ensure_ascii=False) if isinstance(x, list) else x
+            for x in values
+        ]
+        if self.entity in EXTRA_ENTITIES:
+            row.append(self._get_extra(record) or "")
+        return row
+
+
+def export(records: Iterable, path: str, entity: str = "chart", **kwargs) -> int:
+    """Writes records to path (see RymExporter), returns the number written."""
+    with RymExporter(path, entity, **kwargs) as exporter:
+        exporter.write_many(records)
+    return exporter.count
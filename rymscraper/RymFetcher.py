@@ -0,0 +1,75 @@
+import abc
+import logging
+from typing import Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# http statuses of the rate-limited requests, retried after a backoff
+RATE_LIMIT_STATUSES = (429, 503)
+
+
+class RymFetcher(abc.ABC):
+    """Interface of the backends downloading the html of static pages.
+
+    Pages needing an interaction (clicks, popups) are still loaded by the
+    selenium browser.
+    """
+
+    @abc.abstractmethod
+    def fetch(self, url: str) -> str:
+        """Returns the html of an url."""
+
+    def fetch_page(self, url: str) -> Tuple[str, int, int]:
+        """Returns the html of an url, the number of bytes downloaded and the
+        http status of the response."""
+        html = self.fetch(url)
+        return html, len(html.encode("utf-8")), 200
+
+    def close(self):
+        pass
+
+
+class HttpFetcher(RymFetcher):
+    """Fetcher using a pooled keep-alive requests session."""
+
+    headers = {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:109.0) Gecko/20100101 Firefox/115.0",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "en-US,en;q=0.5",
+    }
+
+    def __init__(self, pool_size: int = 10, timeout: float = 30):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=Retry(
+                total=3, backoff_factor=1, status_forcelist=[500, 502, 504]
+            ),
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url: str) -> str:
+        return self.fetch_page(url)[0]
+
+    def fetch_page(self, url: str) -> Tuple[str, int, int]:
+        logger.debug("fetch(%s)", url)
+        response = self.session.get(str(url), timeout=self.timeout)
+        # ban (403) and rate-limit pages are handled by the browser
+        if response.status_code not in (403,) + RATE_LIMIT_STATUSES:
+            response.raise_for_status()
+        # compressed size read from the connection
+        return (
+            response.text,
+            response.raw.tell() or len(response.content),
+            response.status_code,
+        )
+
+    def close(self):
+        self.session.close()
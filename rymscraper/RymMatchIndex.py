@@ -0,0 +1,119 @@
+import re
+import unicodedata
+from typing import Any, Callable, List, Optional, Tuple
+from rapidfuzz import fuzz, process
+
+# "Romanized [Original]" names, as returned by the chart parser
+LOCALIZED_NAME = re.compile(r"^(.*\S)\s*\[(.+)\]$")
+PUNCTUATION = re.compile(r"[^\w\s]")
+
+
+def normalize_name(name: str) -> str:
+    """Returns a name without case, diacritics and punctuation."""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(x for x in name if not unicodedata.combining(x))
+    name = PUNCTUATION.sub(" ", name.casefold().replace("&", " and "))
+    return " ".join(name.split())
+
+
+def get_name_variants(name: str) -> List[str]:
+    """Returns the normalized variants of a name (full, romanized and original)."""
+    variants = [name]
+    localized = LOCALIZED_NAME.match(name)
+    if localized:
+        variants += [localized.group(1), localized.group(2)]
+    normalized_variants = []
+    for variant in variants:
+        variant = normalize_name(variant)
+        if variant and variant not in normalized_variants:
+            normalized_variants.append(variant)
+    return normalized_variants
+
+
+class RymMatchIndex:
+    """Fuzzy-match index over a list of names.
+
+    Names are normalized once when the index is created, with their
+    romanized and original versions indexed separately. Queries return
+    (name, score, value) tuples, value being the element of values at the
+    position of the matched name (the name itself by default).
+    """
+
+    def __init__(
+        self,
+        names: List[str],
+        values: List[Any] = None,
+        scorer: Callable = fuzz.WRatio,
+        score_cutoff: float = 90,
+    ):
+        self.names = list(names)
+        self.values = list(values) if values is not None else self.names
+        self.scorer = scorer
+        self.score_cutoff = score_cutoff
+        self._choices = []
+        self._choice_positions = []
+        for position, name in enumerate(self.names):
+            for variant in get_name_variants(name):
+                self._choices.append(variant)
+                self._choice_positions.append(position)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _get_match(self, position: int, score: float) -> Tuple[str, float, Any]:
+        return self.names[position], score, self.values[position]
+
+    def query(
+        self, name: str, limit: int = 5, score_cutoff: float = None
+    ) -> List[Tuple[str, float, Any]]:
+        """Returns the limit best matches of name, best first."""
+        score_cutoff = self.score_cutoff if score_cutoff is None else score_cutoff
+        matches = process.extract(
+            normalize_name(name),
+            self._choices,
+            scorer=self.scorer,
+            score_cutoff=score_cutoff,
+            limit=None,
+        )
+        results = []
+        positions = set()
+        for _, score, choice in matches:
+            position = self._choice_positions[choice]
+            if position not in positions:
+                positions.add(position)
+                results.append(self._get_match(position, score))
+            if len(results) == limit:
+                break
+        return results
+
+    def best(self, name: str, score_cutoff: float = None) -> Optional[Tuple[str, float, Any]]:
+        """Returns the best match of name, None if under score_cutoff."""
+        matches = self.query(name, limit=1, score_cutoff=score_cutoff)
+        return matches[0] if matches else None
+
+    def query_many(
+        self, names: List[str], score_cutoff: float = None, workers: int = 1
+    ) -> List[Optional[Tuple[str, float, Any]]]:
+        """Returns the best match of every name at once, None if under score_cutoff.
+
+        workers is the number of threads used by rapidfuzz (-1 for all cores).
+        """
+        score_cutoff = self.score_cutoff if score_cutoff is None else score_cutoff
+        if not names or not self._choices:
+            return [None] * len(names)
+        scores = process.cdist(
+            [normalize_name(x) for x in names],
+            self._choices,
+            scorer=self.scorer,
+            workers=workers,
+        )
+        results = []
+        for row in scores:
+            choice = int(row.argmax())
+            if row[choice] >= score_cutoff:
+                results.append(
+                    self._get_match(self._choice_positions[choice], float(row[choice]))
+                )
+            else:
+                results.append(None)
+        return results
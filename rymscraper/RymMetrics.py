@@ -0,0 +1,81 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class RymMetrics:
+    """Counters of the requests, tagged by page type.
+
+    Every event adds a value to the counter of its name and page type
+    (chart, release, artist, search, timeline, discography, other) and calls
+    the hooks registered for its name with (event, page_type, value, data),
+    for example to forward it to another monitoring library. Events:
+        requests, bytes: Pages downloaded and their size.
+        navigation_seconds: Download and interaction time of the pages
+        (including the explicit waits).
+        parse_seconds: Extraction time of the pages.
+        wait_seconds: Time spent by the rate limit and the explicit waits.
+        backoff_seconds: Time spent waiting after the rate-limits.
+        cache_hits: Pages read from the cache.
+        retries, rate_limits: Retried pages and rate-limits detected.
+        starts, start_seconds, restarts: Firefox launches.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hooks: Dict[str, list] = {}
+        self.counters: Dict[str, Dict[str, float]] = {}
+
+    def on(self, event: str, callback: Callable):
+        """Registers a callback called on every event of this name ("*" for
+        all the events)."""
+        with self._lock:
+            self._hooks.setdefault(event, []).append(callback)
+
+    def emit(self, event: str, page_type: str = "other", value: float = 1, **data):
+        """Adds value to the counter of the event and calls its hooks."""
+        with self._lock:
+            counters = self.counters.setdefault(event, {})
+            counters[page_type] = counters.get(page_type, 0) + value
+            hooks = self._hooks.get(event, []) + self._hooks.get("*", [])
+        for callback in hooks:
+            try:
+                callback(event, page_type, value, data)
+            except Exception as e:
+                logger.error("Error in the %s metrics hook : %s", event, e)
+
+    @contextmanager
+    def timer(self, event: str, page_type: str = "other", **data):
+        """Emits the duration in seconds of the enclosed block."""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.emit(event, page_type, time.monotonic() - start, **data)
+
+    def get(self, event: str, page_type: str = None) -> float:
+        """Returns the counter of an event, for all the page types if None."""
+        with self._lock:
+            counters = self.counters.get(event, {})
+            if page_type is None:
+                return sum(counters.values())
+            return counters.get(page_type, 0)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns a copy of the counters, by event and page type."""
+        with self._lock:
+            return {k: dict(v) for k, v in self.counters.items()}
+
+    def to_prometheus(self, prefix: str = "rymscraper") -> str:
+        """Returns the counters in the Prometheus text format."""
+        lines = []
+        for event, counters in sorted(self.stats().items()):
+            name = f"{prefix}_{event}_total"
+            lines.append(f"# TYPE {name} counter")
+            for page_type, value in sorted(counters.items()):
+                lines.append(f'{name}{{page_type="{page_type}"}} {value:g}')
+        return "\n".join(lines) + "\n"
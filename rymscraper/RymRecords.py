@@ -0,0 +1,388 @@
+"""Typed records of the scraped entities.
+
+The parsers of utils return dicts of strings. The records store the same
+informations with __slots__ and typed values (ratings as float, counts and
+ranks as int, dates as date, None for the missing "NA" values), and
+to_dict returns the dict of strings again. The keys of the dicts without a
+typed field (album infos table, complementary infos) are kept as strings in
+extra.
+"""
+import datetime
+import re
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+NA = "NA"
+# formats of the dates of rateyourmusic, the most precise first
+DATE_FORMATS = ["%d %B %Y", "%d %b %Y", "%B %Y", "%b %Y", "%Y"]
+RATING_TEXT = re.compile(r"([\d.]+)\s*/\s*[\d.]+\s*from\s*([\d,]+)")
+# kinds of the fields stored with their format in _<attribute>_format
+DATE_KINDS = ("date", "leading_date")
+# value of the keys missing from a dict
+MISSING = object()
+# styles of the texts of a field, 2 bits by field in _styles: the default
+# text, the alternative one ("71,234", "4.3", "" for None), the key being
+# left out (or "NA" for the optional keys)
+STYLES = (0, 1, 2)
+STYLE_BITS = 2
+# the same _styles values are shared by the records
+SHARED_STYLES: Dict[int, int] = {}
+
+
+def parse_int(text: str) -> Optional[int]:
+    try:
+        return int(text.replace(",", "").replace("#", "").strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_float(text: str) -> Optional[float]:
+    try:
+        return float(text.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def format_alternative(value: Any, kind: str) -> Any:
+    """Returns the alternative text of a value, MISSING if it has none."""
+    if value is None:
+        return ""
+    if kind == "int":
+        return f"{value:,}"
+    if kind == "float":
+        return str(value)
+    return MISSING
+
+
+def format_date(date: datetime.date, date_format: str) -> str:
+    """Returns a date in a strftime format, without leading zero on the day."""
+    return date.strftime(date_format.replace("%d", str(date.day)))
+
+
+def parse_date(text: str) -> Tuple[Optional[datetime.date], Optional[str]]:
+    """Returns the date of a text and its format, or None and the text if
+    it isn't a date. The dates without day or month are set to the first
+    day of their month or year."""
+    for date_format in DATE_FORMATS:
+        try:
+            date = datetime.datetime.strptime(text, date_format).date()
+        except (TypeError, ValueError):
+            continue
+        # the text can be rendered back by to_dict
+        if format_date(date, date_format) == text:
+            return date, date_format
+    return None, text
+
+
+def parse_leading_date(text: str) -> Tuple[Optional[datetime.date], Optional[str]]:
+    """Returns the date starting a text ("January 1998, San Diego, CA") and
+    its format followed by the rest of the text, or None and the text."""
+    parts = str(text).split(", ")
+    for end in range(len(parts), 0, -1):
+        date_text = ", ".join(parts[:end])
+        date, date_format = parse_date(date_text)
+        if date is not None:
+            return date, date_format + text[len(date_text) :].replace("%", "%%")
+    return None, text
+
+
+def format_value(value: Any, kind: str) -> Any:
+    if value is None:
+        return NA
+    if kind == "float":
+        return f"{value:.2f}"
+    if kind == "int":
+        return str(value)
+    if kind == "list":
+        return list(value)
+    if kind == "genres":
+        return ", ".join(value)
+    if kind == "genre_lines":
+        return "\n".join(", ".join(x) for x in value)
+    if kind == "rym_rating":
+        return f"{value[0]:.2f} / 5.0 from {value[1]:,} ratings"
+    return value
+
+
+def parse_genres(text: str) -> Tuple[str, ...]:
+    # the genre names are shared by all the records
+    return tuple(sys.intern(x.strip()) for x in text.split(",") if x.strip())
+
+
+def parse_value(text: Any, kind: str) -> Any:
+    if text == NA or text is None:
+        return None
+    if kind == "float":
+        return parse_float(text)
+    if kind == "int":
+        return parse_int(text)
+    if kind == "list":
+        return tuple(text)
+    if kind == "genres":
+        return parse_genres(text)
+    if kind == "genre_lines":
+        return tuple(parse_genres(x) for x in text.split("\n"))
+    if kind == "rym_rating":
+        rating = RATING_TEXT.search(text)
+        if not rating:
+            return None
+        return parse_float(rating.group(1)), parse_int(rating.group(2))
+    return text
+
+
+class RymRecord:
+    """Base class of the records.
+
+    fields lists the (attribute, dict key, kind) of the typed fields, kind
+    being "str", "int", "float", "date", "leading_date" (date followed by
+    a text), "genres", "genre_lines" (lines of genres), "rym_rating"
+    (rating and number of ratings) or "list". A date attribute is stored
+    with its format in _<attribute>_format. The keys of optional_keys are
+    left out of to_dict when their value is None. computed_fields lists the
+    (attribute, column, kind) of the values derived from the fields,
+    exported as columns but left out of to_dict.
+
+    The style of the texts of a dict ("71,234" or "71234", "4.3" or
+    "4.30", "" or "NA") is kept in _styles, so that to_dict returns the
+    dict the record was created from. A text matching none of the styles
+    is kept in extra.
+    """
+
+    __slots__ = ("extra", "_styles")
+    fields: List[Tuple[str, str, str]] = []
+    computed_fields: List[Tuple[str, str, str]] = []
+    optional_keys: Tuple[str, ...] = ()
+
+    def __init__(self, **kwargs):
+        for attribute, _, kind in self.fields:
+            setattr(self, attribute, kwargs.get(attribute))
+            if kind in DATE_KINDS:
+                date_format = kwargs.get(f"_{attribute}_format")
+                if date_format is None and kwargs.get(attribute) is not None:
+                    date_format = "%d %B %Y"
+                setattr(self, f"_{attribute}_format", date_format)
+        # None rather than an empty dict to save memory
+        self.extra = kwargs.get("extra") or None
+        self._styles = 0
+
+    @classmethod
+    def from_dict(cls, dict_record: Dict):
+        """Returns the record of a dict returned by the parsers."""
+        kwargs = {}
+        for attribute, key, kind in cls.fields:
+            text = dict_record.get(key)
+            if kind in DATE_KINDS:
+                parse = parse_date if kind == "date" else parse_leading_date
+                kwargs[attribute], kwargs[f"_{attribute}_format"] = (
+                    parse(text) if text is not None else (None, None)
+                )
+            else:
+                kwargs[attribute] = parse_value(text, kind)
+        keys = {key for _, key, _ in cls.fields}
+        kwargs["extra"] = {k: v for k, v in dict_record.items() if k not in keys}
+        record = cls(**kwargs)
+        styles = 0
+        for index, (attribute, key, kind) in enumerate(cls.fields):
+            text = dict_record.get(key, MISSING)
+            for style in STYLES:
+                if record._format_field(attribute, key, kind, style) == text:
+                    styles |= style << (index * STYLE_BITS)
+                    break
+            else:
+                # rendered from extra by to_dict
+                record.extra = record.extra or {}
+                record.extra[key] = text
+        record._styles = SHARED_STYLES.setdefault(styles, styles)
+        return record
+
+    @classmethod
+    def from_dicts(cls, dict_records: List[Dict]) -> List:
+        return [cls.from_dict(x) if x is not None else None for x in dict_records]
+
+    def _format_field(self, attribute: str, key: str, kind: str, style: int = 0) -> Any:
+        """Returns the text of a field in a style, MISSING if left out."""
+        value = getattr(self, attribute)
+        if kind in DATE_KINDS:
+            date_format = getattr(self, f"_{attribute}_format")
+            if value is not None:
+                return format_date(value, date_format)
+            # text which isn't a date
+            return date_format if date_format is not None else MISSING
+        if style == 1:
+            return format_alternative(value, kind)
+        if value is None and (key in self.optional_keys) != (style == 2):
+            return MISSING
+        if style == 2:
+            return MISSING if value is not None else NA
+        return format_value(value, kind)
+
+    def to_dict(self) -> Dict:
+        """Returns the dict of strings returned by the parsers."""
+        dict_record = {}
+        for index, (attribute, key, kind) in enumerate(self.fields):
+            style = (self._styles >> (index * STYLE_BITS)) & 3
+            text = self._format_field(attribute, key, kind, style)
+            if text is not MISSING:
+                dict_record[key] = text
+        if self.extra:
+            dict_record.update(self.extra)
+        return dict_record
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        values = ", ".join(
+            f"{attribute}={getattr(self, attribute)!r}" for attribute, _, _ in self.fields
+        )
+        return f"{type(self).__name__}({values})"
+
+
+class ChartRow(RymRecord):
+    __slots__ = (
+        "rank",
+        "artist",
+        "album",
+        "date",
+        "_date_format",
+        "genres",
+        "rating",
+        "ratings",
+        "reviews",
+    )
+    fields = [
+        ("rank", "Rank", "int"),
+        ("artist", "Artist", "str"),
+        ("album", "Album", "str"),
+        ("date", "Date", "date"),
+        ("genres", "Genres", "genres"),
+        ("rating", "RYM Rating", "float"),
+        ("ratings", "Ratings", "int"),
+        ("reviews", "Reviews", "int"),
+    ]
+
+
+class Release(RymRecord):
+    """Release of a discography, with its complementary infos in extra."""
+
+    __slots__ = (
+        "artist",
+        "category",
+        "name",
+        "url",
+        "date",
+        "_date_format",
+        "year",
+        "rating",
+        "ratings",
+        "reviews",
+        "rank_overall",
+        "rank_year",
+    )
+    fields = [
+        ("artist", "Artist", "str"),
+        ("category", "Category", "str"),
+        ("name", "Name", "str"),
+        ("url", "URL", "str"),
+        ("date", "Date", "date"),
+        ("year", "Year", "int"),
+        ("rating", "Average Rating", "float"),
+        ("ratings", "Ratings", "int"),
+        ("reviews", "Reviews", "int"),
+        ("rank_overall", "Rank Overall", "int"),
+        ("rank_year", "Rank Year", "int"),
+    ]
+    # only present with the complementary infos
+    optional_keys = ("Rank Overall", "Rank Year")
+
+
+class Album(RymRecord):
+    """Album page, the other rows of its infos table being kept in extra.
+
+    rym_rating is the (rating, number of ratings) of the "RYM Rating" row,
+    also available as rating and ratings. genres are the lines of the
+    "Genres" row, primary then secondary genres.
+    """
+
+    __slots__ = (
+        "name",
+        "artist",
+        "type",
+        "released",
+        "_released_format",
+        "rym_rating",
+        "genres",
+        "descriptors",
+        "language",
+        "track_listing",
+        "colorscheme",
+    )
+    fields = [
+        ("name", "Name", "str"),
+        ("artist", "Artist", "str"),
+        ("type", "Type", "str"),
+        ("released", "Released", "date"),
+        ("rym_rating", "RYM Rating", "rym_rating"),
+        ("genres", "Genres", "genre_lines"),
+        ("descriptors", "Descriptors", "genres"),
+        ("language", "Language", "str"),
+        ("track_listing", "Track listing", "list"),
+        ("colorscheme", "Colorscheme", "list"),
+    ]
+    computed_fields = [
+        ("rating", "Rating", "float"),
+        ("ratings", "Ratings", "int"),
+        ("primary_genres", "Primary Genres", "genres"),
+        ("secondary_genres", "Secondary Genres", "genres"),
+    ]
+    # rows of the infos table, missing when the page has no tracklist or
+    # color bar
+    optional_keys = (
+        "Type",
+        "RYM Rating",
+        "Genres",
+        "Descriptors",
+        "Language",
+        "Track listing",
+        "Colorscheme",
+    )
+
+    @property
+    def rating(self) -> Optional[float]:
+        return self.rym_rating[0] if self.rym_rating else None
+
+    @property
+    def ratings(self) -> Optional[int]:
+        return self.rym_rating[1] if self.rym_rating else None
+
+    @property
+    def primary_genres(self) -> Tuple[str, ...]:
+        return self.genres[0] if self.genres else ()
+
+    @property
+    def secondary_genres(self) -> Tuple[str, ...]:
+        return self.genres[1] if self.genres and len(self.genres) > 1 else ()
+
+
+class Artist(RymRecord):
+    """Artist page, the other rows of its infos being kept in extra.
+
+    The dates of the "Formed" (groups) and "Born" (persons) rows are
+    followed by a place, kept in their format.
+    """
+
+    __slots__ = ("name", "formed", "_formed_format", "born", "_born_format", "genres")
+    fields = [
+        ("name", "Name", "str"),
+        ("formed", "Formed", "leading_date"),
+        ("born", "Born", "leading_date"),
+        ("genres", "Genres", "genres"),
+    ]
+    optional_keys = ("Genres",)
+
+
+class CatalogEntry(RymRecord):
+    """Line of the timeline of an album."""
+
+    __slots__ = ("date", "_date_format", "user")
+    fields = [("date", "Date", "date"), ("user", "User", "str")]
@@ -0,0 +1,81 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RymResolver:
+    """Cache of the name lookups.
+
+    Maps the normalized artist names to the urls of their search results,
+    and the artist urls to the [name, url] of their albums, so that
+    repeated lookups don't load any page. Entries expire after ttl seconds.
+    The cache is kept in memory and saved to path if set.
+    """
+
+    def __init__(self, path: str = None, ttl: float = 7 * 24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._artist_urls: Dict[str, List] = {}
+        self._album_indexes: Dict[str, List] = {}
+        # match indexes built from the album indexes, not saved
+        self._match_indexes: Dict[str, List] = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._artist_urls = data["artist_urls"]
+            self._album_indexes = data["album_indexes"]
+
+    @staticmethod
+    def normalize_name(name: str) -> str:
+        return " ".join(name.lower().split())
+
+    def _get(self, entries: Dict[str, List], key: str) -> Optional[List]:
+        with self._lock:
+            entry = entries.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def _set(self, entries: Dict[str, List], key: str, value: List):
+        with self._lock:
+            entries[key] = [time.time(), value]
+
+    def get_artist_urls(self, name: str) -> Optional[List[str]]:
+        """Returns the search results of an artist name, None if unknown."""
+        return self._get(self._artist_urls, self.normalize_name(name))
+
+    def set_artist_urls(self, name: str, urls: List[str]):
+        self._set(self._artist_urls, self.normalize_name(name), urls)
+
+    def get_album_index(self, artist_url: str) -> Optional[List[List[str]]]:
+        """Returns the [name, url] of the albums of an artist, None if unknown."""
+        return self._get(self._album_indexes, artist_url.rstrip("/"))
+
+    def set_album_index(self, artist_url: str, album_index: List[List[str]]):
+        self._set(self._album_indexes, artist_url.rstrip("/"), album_index)
+
+    def get_match_index(self, artist_url: str):
+        """Returns the RymMatchIndex of the albums of an artist, None if unknown."""
+        return self._get(self._match_indexes, artist_url.rstrip("/"))
+
+    def set_match_index(self, artist_url: str, match_index):
+        self._set(self._match_indexes, artist_url.rstrip("/"), match_index)
+
+    def save(self):
+        """Saves the cache to path."""
+        if not self.path:
+            return
+        with self._lock:
+            data = {
+                "artist_urls": self._artist_urls,
+                "album_indexes": self._album_indexes,
+            }
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        logger.debug("Resolver cache saved to %s.", self.path)
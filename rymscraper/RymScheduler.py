@@ -0,0 +1,120 @@
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RymScheduler:
+    """Request scheduler shared by every browser of a RymNetwork.
+
+    Requests are spaced by a token bucket refilled at requests_per_minute.
+    The rate is adapted with AIMD: it is halved each time a rate-limit is
+    detected, and increased by increase_step after every quiet period of
+    probe_interval seconds without rate-limit, up to max_requests_per_minute.
+    Rate-limited requests are retried max_retries times after a jittered
+    exponential backoff.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = None,
+        burst: int = 1,
+        min_requests_per_minute: float = 1,
+        max_requests_per_minute: float = None,
+        increase_step: float = 1,
+        probe_interval: float = 60,
+        backoff_base: float = 5,
+        backoff_max: float = 300,
+        max_retries: int = 5,
+    ):
+        """
+        Parameters:
+            requests_per_minute: Starting rate. None disables the limit.
+            burst: Max number of requests sent without waiting.
+            min_requests_per_minute: Lowest rate reached after rate-limits.
+            max_requests_per_minute: Highest rate reached by the probing.
+            Defaults to requests_per_minute.
+            increase_step: Requests per minute added after a quiet period.
+            probe_interval: Duration of a quiet period in seconds.
+            backoff_base: Backoff of the first retry in seconds.
+            backoff_max: Max backoff in seconds.
+            max_retries: Number of retries of a rate-limited request.
+
+        """
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.min_requests_per_minute = min_requests_per_minute
+        self.max_requests_per_minute = max_requests_per_minute or requests_per_minute
+        self.increase_step = increase_step
+        self.probe_interval = probe_interval
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._last_rate_change = self._last_refill
+
+    def _refill(self, now: float):
+        rate = self.requests_per_minute / 60.0
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * rate)
+        self._last_refill = now
+
+    def wait(self) -> float:
+        """Blocks until the next request is allowed, returns the delay."""
+        if not self.requests_per_minute:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # the token is reserved now, the caller sleeps until it exists
+            self._tokens -= 1
+            delay = max(0.0, -self._tokens * 60.0 / self.requests_per_minute)
+        if delay:
+            logger.debug("Politeness limit : waiting %.2f seconds.", delay)
+            time.sleep(delay)
+        return delay
+
+    def on_success(self):
+        """Increases the rate after a quiet period."""
+        if not self.requests_per_minute:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_rate_change < self.probe_interval:
+                return
+            self._last_rate_change = now
+            if self.requests_per_minute < self.max_requests_per_minute:
+                self._refill(now)
+                self.requests_per_minute = min(
+                    self.max_requests_per_minute,
+                    self.requests_per_minute + self.increase_step,
+                )
+                logger.debug("Increasing rate to %.2f rpm.", self.requests_per_minute)
+
+    def on_rate_limited(self):
+        """Halves the rate."""
+        if not self.requests_per_minute:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._last_rate_change = now
+            self.requests_per_minute = max(
+                self.min_requests_per_minute, self.requests_per_minute / 2
+            )
+            logger.warning("Decreasing rate to %.2f rpm.", self.requests_per_minute)
+
+    def get_backoff(self, attempt: int) -> float:
+        """Returns the jittered backoff in seconds before the retry number attempt."""
+        delay = min(self.backoff_max, self.backoff_base * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def backoff(self, attempt: int) -> float:
+        """Sleeps before the retry number attempt, returns the delay."""
+        delay = self.get_backoff(attempt)
+        logger.warning("Rate-limit backoff : waiting %.2f seconds.", delay)
+        time.sleep(delay)
+        return delay
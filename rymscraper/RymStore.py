@@ -0,0 +1,366 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from . import RymCache, RymRecords
+
+logger = logging.getLogger(__name__)
+
+GENRE_SEPARATOR = re.compile(r"[,\n]")
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS albums (
+        url TEXT PRIMARY KEY,
+        name TEXT,
+        artist TEXT COLLATE NOCASE,
+        year INTEGER,
+        rating REAL,
+        ratings INTEGER,
+        data TEXT,
+        updated_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS artists (
+        url TEXT PRIMARY KEY,
+        name TEXT,
+        data TEXT,
+        updated_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS discographies (
+        url TEXT PRIMARY KEY,
+        updated_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS releases (
+        url TEXT,
+        discography_url TEXT,
+        position INTEGER,
+        artist TEXT COLLATE NOCASE,
+        name TEXT,
+        category TEXT,
+        year INTEGER,
+        rating REAL,
+        ratings INTEGER,
+        reviews INTEGER,
+        data TEXT,
+        updated_at REAL,
+        PRIMARY KEY (discography_url, url)
+    )""",
+    """CREATE TABLE IF NOT EXISTS release_infos (
+        url TEXT PRIMARY KEY,
+        data TEXT,
+        updated_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS charts (
+        url TEXT PRIMARY KEY,
+        has_next_page INTEGER,
+        updated_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS chart_rows (
+        chart_url TEXT,
+        rank INTEGER,
+        artist TEXT COLLATE NOCASE,
+        album TEXT,
+        year INTEGER,
+        rating REAL,
+        ratings INTEGER,
+        reviews INTEGER,
+        data TEXT,
+        PRIMARY KEY (chart_url, rank)
+    )""",
+    """CREATE TABLE IF NOT EXISTS timelines (
+        url TEXT PRIMARY KEY,
+        data TEXT,
+        updated_at REAL
+    )""",
+    """CREATE TABLE IF NOT EXISTS genres (
+        url TEXT,
+        genre TEXT COLLATE NOCASE,
+        PRIMARY KEY (url, genre)
+    )""",
+]
+INDEXES = {
+    "albums": ["artist", "year", "rating"],
+    "releases": ["url", "artist", "year", "rating"],
+    "chart_rows": ["artist", "year", "rating"],
+    "genres": ["genre"],
+}
+
+
+def get_genres(text: str) -> List[str]:
+    """Returns the genres of a "Genres" field, primary and secondary."""
+    if not text or text == RymRecords.NA:
+        return []
+    return [x.strip() for x in GENRE_SEPARATOR.split(text) if x.strip()]
+
+
+class RymStore:
+    """Local catalog of the scraped albums, artists, discographies, charts and
+    timelines.
+
+    Entities are stored in a SQLite file keyed by their normalized url and
+    upserted when they are scraped again. The artist, year, genres and
+    rating are stored in indexed columns to query the catalog without
+    loading any page. Entries older than max_age seconds are considered
+    missing by the getters.
+    """
+
+    def __init__(self, path: str = "rymscraper_store.sqlite"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            for statement in SCHEMA:
+                self._connection.execute(statement)
+            for table, columns in INDEXES.items():
+                for column in columns:
+                    self._connection.execute(
+                        f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})"
+                    )
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        return RymCache.normalize_url(url)
+
+    @staticmethod
+    def _is_fresh(updated_at: float, max_age: float = None) -> bool:
+        return max_age is None or time.time() - updated_at < max_age
+
+    def _get_data(self, table: str, url: str, max_age: float = None):
+        data, is_fresh = self._get_entry(table, url, max_age)
+        return data if is_fresh else None
+
+    def _get_entry(self, table: str, url: str, max_age: float = None) -> Tuple:
+        """Returns the data of an url, None if missing, and whether it is
+        younger than max_age."""
+        with self._lock:
+            row = self._connection.execute(
+                f"SELECT data, updated_at FROM {table} WHERE url = ?",
+                (self.get_key(url),),
+            ).fetchone()
+        if row is None:
+            return None, False
+        return json.loads(row[0]), self._is_fresh(row[1], max_age)
+
+    def _set_genres(self, key: str, genres: List[str]):
+        self._connection.execute("DELETE FROM genres WHERE url = ?", (key,))
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO genres VALUES (?, ?)", [(key, x) for x in genres]
+        )
+
+    def get_album(self, url: str, max_age: float = None) -> Optional[Dict]:
+        """Returns the album infos of an url, None if missing or too old."""
+        return self._get_data("albums", url, max_age)
+
+    def set_album(self, url: str, album_infos: Dict):
+        key = self.get_key(url)
+        album = RymRecords.Album.from_dict(album_infos)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO albums VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    album.name,
+                    album.artist,
+                    album.released.year if album.released else None,
+                    album.rating,
+                    album.ratings,
+                    json.dumps(album_infos, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._set_genres(key, get_genres(album_infos.get("Genres")))
+
+    def get_artist(self, url: str, max_age: float = None) -> Optional[Dict]:
+        """Returns the artist infos of an url, None if missing or too old."""
+        return self._get_data("artists", url, max_age)
+
+    def set_artist(self, url: str, artist_infos: Dict):
+        key = self.get_key(url)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO artists VALUES (?, ?, ?, ?)",
+                (
+                    key,
+                    artist_infos.get("Name"),
+                    json.dumps(artist_infos, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            self._set_genres(key, get_genres(artist_infos.get("Genres")))
+
+    def get_discography(self, url: str, max_age: float = None) -> Optional[List[Dict]]:
+        """Returns the releases of the discography of an artist url, None if
+        missing or too old. The complementary infos are stored separately."""
+        key = self.get_key(url)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT updated_at FROM discographies WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None or not self._is_fresh(row[0], max_age):
+                return None
+            rows = self._connection.execute(
+                "SELECT data FROM releases WHERE discography_url = ? ORDER BY position",
+                (key,),
+            ).fetchall()
+        return [json.loads(x[0]) for x in rows]
+
+    def set_discography(self, url: str, artist_disco: List[Dict]):
+        key = self.get_key(url)
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO discographies VALUES (?, ?)", (key, now)
+            )
+            self._connection.execute(
+                "DELETE FROM releases WHERE discography_url = ?", (key,)
+            )
+            for position, dict_disc in enumerate(artist_disco):
+                release = RymRecords.Release.from_dict(dict_disc)
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO releases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        self.get_key(release.url),
+                        key,
+                        position,
+                        release.artist,
+                        release.name,
+                        release.category,
+                        release.year,
+                        release.rating,
+                        release.ratings,
+                        release.reviews,
+                        json.dumps(dict_disc, ensure_ascii=False),
+                        now,
+                    ),
+                )
+
+    def get_release_infos(self, url: str, max_age: float = None) -> Optional[Dict]:
+        """Returns the complementary infos of a release url (see
+        utils.get_complementary_infos), None if missing or too old."""
+        return self._get_data("release_infos", url, max_age)
+
+    def set_release_infos(self, url: str, release_infos: Dict):
+        key = self.get_key(url)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO release_infos VALUES (?, ?, ?)",
+                (key, json.dumps(release_infos, ensure_ascii=False), time.time()),
+            )
+            self._set_genres(key, get_genres(release_infos.get("Genres")))
+
+    def get_chart_page(
+        self, url: str, max_age: float = None
+    ) -> Optional[Tuple[List[Dict], bool]]:
+        """Returns the rows of a chart page and whether it has a next page,
+        None if missing or too old."""
+        key = self.get_key(url)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT has_next_page, updated_at FROM charts WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None or not self._is_fresh(row[1], max_age):
+                return None
+            rows = self._connection.execute(
+                "SELECT data FROM chart_rows WHERE chart_url = ? ORDER BY rank", (key,)
+            ).fetchall()
+        return [json.loads(x[0]) for x in rows], bool(row[0])
+
+    def set_chart_page(self, url: str, rows: List[Dict], has_next_page: bool):
+        key = self.get_key(url)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO charts VALUES (?, ?, ?)",
+                (key, int(has_next_page), time.time()),
+            )
+            self._connection.execute("DELETE FROM chart_rows WHERE chart_url = ?", (key,))
+            for position, dict_row in enumerate(rows):
+                row = RymRecords.ChartRow.from_dict(dict_row)
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO chart_rows VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        row.rank if row.rank is not None else -position,
+                        row.artist,
+                        row.album,
+                        row.date.year if row.date else None,
+                        row.rating,
+                        row.ratings,
+                        row.reviews,
+                        json.dumps(dict_row, ensure_ascii=False),
+                    ),
+                )
+
+    def get_timeline(self, url: str, max_age: float = None) -> Optional[List[Dict]]:
+        """Returns the timeline of an album url, None if missing or too old."""
+        return self._get_data("timelines", url, max_age)
+
+    def get_timeline_entry(
+        self, url: str, max_age: float = None
+    ) -> Tuple[Optional[List[Dict]], bool]:
+        """Returns the timeline of an album url, None if missing, and whether
+        it is younger than max_age. An old timeline is still returned, to
+        only extract its new lines."""
+        return self._get_entry("timelines", url, max_age)
+
+    def set_timeline(self, url: str, album_timeline: List[Dict]):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO timelines VALUES (?, ?, ?)",
+                (
+                    self.get_key(url),
+                    json.dumps(album_timeline, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+
+    def find_albums(
+        self,
+        artist: str = None,
+        year: int = None,
+        genre: str = None,
+        min_rating: float = None,
+    ) -> List[Dict]:
+        """Returns the infos of the stored albums and releases matching all the
+        filters, best rated first.
+
+        Parameters:
+            artist: Name of the artist (case-insensitive).
+            year: Release year.
+            genre: Primary or secondary genre (case-insensitive). Only the
+            albums and the releases extracted with their complementary infos
+            have genres.
+            min_rating: Min average rating.
+
+        """
+        conditions = []
+        parameters = []
+        if artist is not None:
+            conditions.append("artist = ?")
+            parameters.append(artist)
+        if year is not None:
+            conditions.append("year = ?")
+            parameters.append(year)
+        if genre is not None:
+            conditions.append("url IN (SELECT url FROM genres WHERE genre = ?)")
+            parameters.append(genre)
+        if min_rating is not None:
+            conditions.append("rating >= ?")
+            parameters.append(min_rating)
+        where = " AND ".join(conditions) or "1"
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT data, rating FROM albums WHERE {where}", parameters
+            ).fetchall()
+            # releases of the discographies which weren't extracted as albums
+            rows += self._connection.execute(
+                f"""SELECT data, rating FROM releases WHERE {where}
+                AND url NOT IN (SELECT url FROM albums) GROUP BY url""",
+                parameters,
+            ).fetchall()
+        rows.sort(key=lambda x: x[1] if x[1] is not None else -1, reverse=True)
+        return [json.loads(x[0]) for x in rows]
+
+    def close(self):
+        self._connection.close()
@@ -1,10 +1,53 @@
-# For now you will have to directly change the string values. Look at examples/get_chart.py for examples.
+# Chart urls, for example:
 # https://rateyourmusic.com/charts/top/release/1984-2002/g:ambient/loc:france/minr:200/
 # https://rateyourmusic.com/charts/top/album,ep,single,unauth,djmix/2010s/g:ambient,blues/d:atmosphere,form,theme,bittersweet,epic/s:classical%2dmusic/loc:algeria,bouvet%2disland%2dbouvetoya,europe,antarctica%2d1/minr:200/pop:5/
-from typing import Optional
+# They can be built with RymUrl (see examples/get_chart.py) or parsed with RymUrl.from_url.
+import itertools
+from typing import Dict, List, Optional, Union
+from urllib.parse import unquote, urlsplit
+
+URL_BASE = "https://rateyourmusic.com/charts"
+# attribute of each filter of the chart urls, in their canonical order
+FILTERS = {
+    "g": "genres",
+    "s": "secondary_genres",
+    "loc": "origin_countries",
+    "l": "language",
+    "d": "descriptors",
+    "minr": "min_ratings",
+    "pop": "popularity",
+}
+LIST_FILTERS = {"g", "s", "loc", "l", "d"}
+
+
+def canonicalize_values(values) -> Optional[str]:
+    """Returns the canonical version of a comma-separated list of filter
+    values: lowercase, spaces replaced by "-", without duplicates, sorted
+    with the excluded values (prefixed by "-") last."""
+    if values is None:
+        return None
+    names = set()
+    for value in unquote(str(values)).lower().split(","):
+        value = "-".join(value.split())
+        if value.strip("-"):
+            names.add(value)
+    if not names:
+        return None
+    return ",".join(sorted(names, key=lambda x: (x.startswith("-"), x)))
 
 
 class RymUrl:
+    """Url of a rateyourmusic chart.
+
+    The list filters (genres, secondary_genres, origin_countries, language,
+    descriptors) are comma-separated strings, a value prefixed by "-" being
+    excluded from the chart (genres="rock,-metal"). The url is rendered in a
+    canonical form (see canonicalize_values) by str, which is also used by
+    == and hash: two RymUrl of the same chart page are equal whatever the
+    spelling of their filters. The page being part of it, a RymUrl
+    shouldn't be kept in a set or as a dict key while it is extracted.
+    """
+
     @staticmethod
     def sanitize_name(name: Optional[str]) -> Optional[str]:
         if name is None:
@@ -20,9 +63,22 @@ class RymUrl:
         language: str = None,
         descriptors: str = None,
         page=1,
+        secondary_genres: str = None,
+        min_ratings: int = None,
+        popularity: int = None,
+        chart_type: str = "top",
+        other_filters: Dict[str, str] = None,
     ):
-        """The language should be the 2 letter code for the language. For example, English is en, French is fr, etc."""
-        self.url_base = "https://rateyourmusic.com/charts/top"
+        """The language should be the 2 letter code for the language. For example, English is en, French is fr, etc.
+
+        Parameters:
+            min_ratings: Min number of ratings of the releases (minr filter).
+            popularity: Value of the pop filter.
+            chart_type: Type of chart ("top", "popular", "esoteric", ...).
+            other_filters: Filters of the url without attribute, by key.
+
+        """
+        self.url_base = f"{URL_BASE}/{chart_type}"
 
         self.kind = kind
         self.year = year
@@ -31,14 +87,111 @@ class RymUrl:
         self.language = self.sanitize_name(language)
         self.descriptors = self.sanitize_name(descriptors)
         self.page = page
+        self.secondary_genres = self.sanitize_name(secondary_genres)
+        self.min_ratings = min_ratings
+        self.popularity = popularity
+        self.other_filters = other_filters or {}
+
+    @classmethod
+    def from_url(cls, url: str):
+        """Returns the RymUrl of a chart url, with its page (1 if missing).
+
+        The filters are read whatever their order and spelling (%2d or "-",
+        case), the unknown filters being kept in other_filters.
+        """
+        parts = [x for x in urlsplit(str(url).strip()).path.split("/") if x]
+        if len(parts) < 3 or parts[0] != "charts":
+            raise Exception(f"{url} is not a chart url. Exiting.")
+        kwargs = {"chart_type": parts[1], "kind": unquote(parts[2]), "other_filters": {}}
+        segments = parts[3:]
+        # the year is missing from some urls (all-time), a page has less
+        # than 4 digits
+        if segments and ":" not in segments[0] and not (
+            segments[0].isdigit() and len(segments[0]) < 4
+        ):
+            kwargs["year"] = unquote(segments.pop(0))
+        for segment in segments:
+            if segment.isdigit():
+                kwargs["page"] = int(segment)
+                continue
+            key, separator, value = segment.partition(":")
+            if not separator:
+                raise Exception(f"Unknown part {segment} in chart url {url}. Exiting.")
+            value = unquote(value)
+            if key not in FILTERS:
+                kwargs["other_filters"][key] = value
+            elif key in LIST_FILTERS:
+                kwargs[FILTERS[key]] = value
+            else:
+                kwargs[FILTERS[key]] = int(value) if value.isdigit() else value
+        return cls(**kwargs)
+
+    def canonical(self) -> str:
+        """Returns the canonical url of the chart page."""
+        kind = canonicalize_values(self.kind) or "album"
+        year = str(self.year or "all-time").strip().lower()
+        segments = []
+        for key, attribute in FILTERS.items():
+            value = getattr(self, attribute)
+            if key in LIST_FILTERS:
+                value = canonicalize_values(value)
+            if value is not None and value != "":
+                segments.append(f"/{key}:{value}")
+        for key, value in sorted(self.other_filters.items()):
+            segments.append(f"/{key}:{value}")
+        return f"{self.url_base}/{kind}/{year}{''.join(segments)}/{self.page}/"
 
     def __repr__(self):
-        genres = f"/g:{self.genres}" if self.genres else ""
-        origin_countries = (
-            f"/loc:{self.origin_countries}" if self.origin_countries else ""
-        )
-        language = f"/l:{self.language}" if self.language else ""
-        descriptors = f"/d:{self.descriptors}" if self.descriptors else ""
-        final_url = f"{self.url_base}/{self.kind}/{self.year}{genres}{origin_countries}{language}{descriptors}/{self.page}/"
+        return self.canonical()
 
-        return final_url
+    def __eq__(self, other):
+        if not isinstance(other, RymUrl):
+            return NotImplemented
+        return str(self) == str(other)
+
+    def __hash__(self):
+        return hash(str(self))
+
+
+def to_rym_url(url: Union[str, RymUrl]) -> RymUrl:
+    """Returns the RymUrl of a chart url, parsed if it is a string."""
+    return url if isinstance(url, RymUrl) else RymUrl.from_url(url)
+
+
+def get_sweep(
+    kinds: Union[str, List[str]] = "album",
+    years: Union[str, List[str]] = None,
+    genres: Union[str, List[str]] = None,
+    origin_countries: Union[str, List[str]] = None,
+    languages: Union[str, List[str]] = None,
+    descriptors: Union[str, List[str]] = None,
+) -> List[RymUrl]:
+    """Returns the chart urls of every combination of the parameters.
+
+    Each parameter is a value or a list of values, None meaning no filter
+    (all-time for the years). Duplicate charts are only returned once.
+    """
+
+    def as_list(values):
+        return values if isinstance(values, (list, tuple)) else [values]
+
+    urls = {}
+    for kind, year, genre, country, language, descriptor in itertools.product(
+        as_list(kinds),
+        as_list(years),
+        as_list(genres),
+        as_list(origin_countries),
+        as_list(languages),
+        as_list(descriptors),
+    ):
+        url = RymUrl(
+            kind=kind,
+            year=year or "all-time",
+            genres=genre,
+            origin_countries=country,
+            language=language,
+            descriptors=descriptor,
+        )
+        # str being canonical, the same chart is only added once
+        urls.setdefault(str(url), url)
+    return list(urls.values())
@@ -1,7 +1,39 @@
+import asyncio
+import contextvars
+import copy
+import functools
+import json
 import logging
-from typing import List, Dict, Optional
-from . import RymBrowser, RymUrl, utils
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import (
+    AsyncIterator,
+    Callable,
+    Iterator,
+    List,
+    Dict,
+    Optional,
+    Tuple,
+    Union,
+)
+from . import (
+    RymBrowser,
+    RymCache,
+    RymCheckpoint,
+    RymFetcher,
+    RymMetrics,
+    RymRecords,
+    RymResolver,
+    RymScheduler,
+    RymStore,
+    RymUrl,
+    utils,
+)
 from rapidfuzz import process, fuzz
+from tqdm import tqdm
 
 logger = logging.getLogger(__name__)
 
@@ -9,180 +41,700 @@ logger = logging.getLogger(__name__)
 class RymNetwork:
     """Class RymNetwork."""
 
-    def __init__(self, headless: bool = True):
-        self.browser = RymBrowser.RymBrowser(headless=headless)
+    def __init__(
+        self,
+        headless: bool = True,
+        workers: int = 1,
+        requests_per_minute: float = 60,
+        scheduler: RymScheduler.RymScheduler = None,
+        cache: RymCache.RymCache = None,
+        backend: str = "selenium",
+        checkpoint: str = None,
+        chart_parser: str = "lxml",
+        resolver: RymResolver.RymResolver = None,
+        wait_timeout: float = 30,
+        scrape_profile: bool = False,
+        profile_dir: str = None,
+        session: str = None,
+        metrics: RymMetrics.RymMetrics = None,
+        store: RymStore.RymStore = None,
+        max_age: float = None,
+        chart_max_age: float = RymCache.DEFAULT_TTLS["chart"],
+    ):
+        """
+        Parameters:
+            headless: Launch the browsers in the background.
+            workers: Number of browsers used by the batch methods.
+            requests_per_minute: Max number of requests sent to rateyourmusic,
+            shared by all the browsers.
+            scheduler: RymScheduler to use instead of the default one created
+            from requests_per_minute (backoff, adaptive rate, retries).
+            cache: RymCache used to store and replay the downloaded pages.
+            backend: "selenium" loads every page in firefox, "http" downloads
+            the static pages with a pooled http session and only launches
+            firefox for the pages needing an interaction.
+            checkpoint: Path of a JSONL file recording the results of the
+            batch methods and chart pages. Running the same job with the same
+            file skips the items already extracted.
+            chart_parser: Parser of the chart pages, "lxml" or "selectolax"
+            (faster, needs the selectolax package).
+            resolver: RymResolver caching the name lookups. Defaults to an
+            in-memory one.
+            wait_timeout: Max duration in seconds of the waits for the
+            content loaded by the clicks (expanded sections, timeline pages).
+            scrape_profile: Don't load the images, fonts, media and trackers
+            in firefox, and disable its disk cache.
+            profile_dir: Directory of the firefox profiles reused between the
+            runs, one subdirectory by browser.
+            session: Path of a JSON file where the cookies, local storage and
+            consent of the browsers are saved when they quit, and restored
+            when they start.
+            metrics: RymMetrics receiving the timings and counters of the
+            requests. Defaults to a new one.
+            store: RymStore where the extracted albums, artists,
+            discographies, chart pages and timelines are saved, and read
+            instead of loading their page again.
+            max_age: Age in seconds after which the entities of the store are
+            extracted again. Never by default.
+            chart_max_age: Age in seconds after which the chart pages of the
+            store are extracted again, the charts changing every day. One day
+            by default, never if None.
+
+        """
+        self.scheduler = scheduler or RymScheduler.RymScheduler(requests_per_minute)
+        self.metrics = metrics or RymMetrics.RymMetrics()
+        self.store = store
+        self.max_age = max_age
+        self.chart_max_age = chart_max_age
+        self.cache = cache
+        self.chart_parser = chart_parser
+        self.resolver = resolver or RymResolver.RymResolver()
+        self.checkpoint = RymCheckpoint.RymCheckpoint(checkpoint) if checkpoint else None
+        if backend == "http":
+            self.fetcher = RymFetcher.HttpFetcher(pool_size=max(1, workers))
+        elif backend == "selenium":
+            self.fetcher = None
+        else:
+            raise Exception(f"Unknown backend {backend}. Exiting.")
+        self.browsers = [
+            RymBrowser.RymBrowser(
+                headless=headless,
+                scheduler=self.scheduler,
+                cache=cache,
+                fetcher=self.fetcher,
+                wait_timeout=wait_timeout,
+                scrape_profile=scrape_profile,
+                profile_dir=os.path.join(profile_dir, str(i)) if profile_dir else None,
+                session=session,
+                metrics=self.metrics,
+            )
+            for i in range(max(1, workers))
+        ]
+        self.browser = self.browsers[0]
+        self._idle_browsers = queue.Queue()
+        for browser in self.browsers:
+            self._idle_browsers.put(browser)
+
+    def close(self):
+        """Closes every browser of the network."""
+        for browser in self.browsers:
+            browser.quit()
+        if self.fetcher:
+            self.fetcher.close()
+        if self.checkpoint:
+            self.checkpoint.close()
+        self.resolver.save()
+
+    def get_wait_stats(self) -> Dict[str, Dict]:
+        """Returns the count, total duration in seconds and timeouts of the
+        waits of every browser, by name ("expand", "timeline", ...)."""
+        wait_stats = {}
+        for browser in self.browsers:
+            for name, stats in browser.wait_stats.items():
+                total = wait_stats.setdefault(
+                    name, {"count": 0, "time": 0.0, "timeouts": 0}
+                )
+                for key, value in stats.items():
+                    total[key] += value
+        return wait_stats
+
+    def get_bytes_stats(self) -> Dict[str, Dict]:
+        """Returns the number of pages, requests, bytes downloaded and total
+        load time in seconds of every browser, by page type."""
+        bytes_stats = {}
+        for browser in self.browsers:
+            for page_type, stats in browser.bytes_stats.items():
+                total = bytes_stats.setdefault(
+                    page_type, {"pages": 0, "requests": 0, "bytes": 0, "time": 0.0}
+                )
+                for key, value in stats.items():
+                    total[key] += value
+        return bytes_stats
+
+    @contextmanager
+    def _get_browser(self):
+        """Borrows an idle browser from the pool."""
+        browser = self._idle_browsers.get()
+        try:
+            yield browser
+        finally:
+            self._idle_browsers.put(browser)
 
-    def get_album_infos(self, url: str = None, name: str = None) -> Dict:
+    def _checkpointed(self, method: str, key: str, function: Callable):
+        """Returns function(), or the result recorded for (method, key) by the checkpoint."""
+        if not self.checkpoint:
+            return function()
+        if self.checkpoint.is_done(method, key):
+            logger.debug("%s already extracted for %s.", key, method)
+            return self.checkpoint.get(method, key)
+        try:
+            result = function()
+        except Exception as e:
+            self.checkpoint.add_failure(method, key, str(e))
+            raise
+        if result is None:
+            self.checkpoint.add_failure(method, key, "No result")
+        else:
+            self.checkpoint.add(method, key, result)
+        return result
+
+    def _map(
+        self,
+        function: Callable,
+        items: List,
+        method: str = None,
+        progress: bool = False,
+    ) -> List:
+        """Applies function to every item using all the browsers.
+
+        Results are returned in the order of items. An item raising an
+        exception gets None as its result. If method is set, the results are
+        recorded by the checkpoint under that name. progress displays a
+        progress bar.
+        """
+
+        cancel_event = RymBrowser.cancel_event.get()
+
+        def safe_function(item):
+            # the threads of the pool don't inherit the context of the caller
+            RymBrowser.cancel_event.set(cancel_event)
+            if RymBrowser.is_cancelled():
+                return None
+            try:
+                if method:
+                    return self._checkpointed(method, str(item), lambda: function(item))
+                return function(item)
+            except Exception as e:
+                logger.error("Error when extracting %s : %s", item, e)
+                return None
+
+        progress_bar = functools.partial(
+            tqdm, total=len(items), dynamic_ncols=True, disable=not progress
+        )
+        if len(self.browsers) == 1:
+            return list(progress_bar(map(safe_function, items)))
+        with ThreadPoolExecutor(max_workers=len(self.browsers)) as executor:
+            return list(progress_bar(executor.map(safe_function, items)))
+
+    def _get_urls_from_album_names(
+        self, names: List[str], method: str = None
+    ) -> Dict[str, Optional[str]]:
+        """Returns the urls of albums in the "Artist - Album" format.
+
+        Names are grouped by artist so that each artist is only searched once,
+        and the artists are spread over all the browsers. Names already
+        extracted by method in the checkpoint are skipped, names not found or
+        not in this format are missing from the result.
+        """
+        if self.checkpoint and method:
+            names = [x for x in names if not self.checkpoint.is_done(method, x)]
+        groups = utils.group_album_names(names)
+        logger.info("Searching %s albums from %s artists.", len(names), len(groups))
+
+        def get_urls(artist_name):
+            with self._get_browser() as browser:
+                return utils.get_urls_from_artist_album_names(
+                    browser, artist_name, groups[artist_name], self.resolver
+                )
+
+        urls = {}
+        for artist_name, artist_urls in zip(groups, self._map(get_urls, list(groups))):
+            urls.update(zip(groups[artist_name], artist_urls or []))
+        return urls
+
+    def get_album_infos(
+        self, url: str = None, name: str = None, typed: bool = False
+    ) -> Dict:
         """Returns a dict containing infos for an album.
 
         Parameters:
             url: Url of the album.
             name: Name of the album in the "Artist - Album" format.
+            typed: Return a RymRecords.Album instead of a dict.
 
         Returns:
             album_info: Dict containing album informations.
 
         """
-        if name:
-            url = utils.get_url_from_album_name(self.browser, name)
-        if not url:
-            return None
-
-        logger.info("Extracting album informations for %s.", url)
-        self.browser.get_url(url)
-        album_infos = utils.get_album_infos(self.browser.get_soup())
+        with self._get_browser() as browser:
+            if name:
+                url = utils.get_url_from_album_name(browser, name, self.resolver)
+            if not url:
+                return None
+
+            album_infos = self.store.get_album(url, self.max_age) if self.store else None
+            if album_infos is None:
+                logger.info("Extracting album informations for %s.", url)
+                browser.get_url(url)
+                with self.metrics.timer("parse_seconds", browser.page_type):
+                    album_infos = utils.get_album_infos(browser.get_soup())
+                if self.store:
+                    self.store.set_album(url, album_infos)
+        if typed:
+            return RymRecords.Album.from_dict(album_infos)
         return album_infos
 
     def get_albums_infos(
-        self, urls: List[str] = None, names: List[str] = None
+        self, urls: List[str] = None, names: List[str] = None, typed: bool = False
     ) -> List[Dict]:
-        """Returns a list of dicts containing infos from several albums."""
+        """Returns a list of dicts (RymRecords.Album if typed) containing infos
+        from several albums."""
         if names:
-            list_albums_infos = [self.get_album_infos(name=x) for x in names]
+            urls = self._get_urls_from_album_names(names, "get_album_infos")
+            list_albums_infos = self._map(
+                lambda x: self.get_album_infos(url=urls.get(x)), names, "get_album_infos"
+            )
         elif urls:
-            list_albums_infos = [self.get_album_infos(url=x) for x in urls]
+            list_albums_infos = self._map(
+                lambda x: self.get_album_infos(url=x), urls, "get_album_infos"
+            )
         else:
             raise Exception("No list of urls or names entered. Exiting.")
 
+        if typed:
+            return RymRecords.Album.from_dicts(list_albums_infos)
         return list_albums_infos
 
-    def get_album_timeline(self, url: str = None, name: str = None) -> List[dict]:
+    def get_album_timeline(
+        self, url: str = None, name: str = None, since: Dict = None, typed: bool = False
+    ) -> List[dict]:
         """Returns a dict containing timeline for an album.
 
         Parameters:
             url: Url of the album.
             name: Name of the album in the "Artist - Album" format.
+            since: Most recent line of a previous extraction of the timeline
+            (its first element). Only the newer lines are extracted.
+            typed: Return RymRecords.CatalogEntry instead of dicts.
 
         Returns:
             album_timeline: Dict containing album timeline.
 
         """
-        if name:
-            url = utils.get_url_from_album_name(self.browser, name)
-        if not url:
-            raise Exception("Invalid url or name. Exiting.")
-
-        logger.info("Extracting album timeline for %s.", url)
-        self.browser.get_url(url)
-        album_infos = utils.get_album_timeline(self.browser)
+        with self._get_browser() as browser:
+            if name:
+                url = utils.get_url_from_album_name(browser, name, self.resolver)
+            if not url:
+                raise Exception("Invalid url or name. Exiting.")
+
+            stored_timeline, is_fresh = (
+                self.store.get_timeline_entry(url, self.max_age)
+                if self.store
+                else (None, False)
+            )
+            if is_fresh:
+                album_infos = stored_timeline
+            else:
+                logger.info("Extracting album timeline for %s.", url)
+                # the timeline needs a live page to click through its pages
+                browser.get_url(
+                    url, use_cache=False, interactive=True, page_type="timeline"
+                )
+                # only the lines newer than the stored ones are extracted, the
+                # whole timeline is extracted to be stored
+                if stored_timeline:
+                    since_line = stored_timeline[0]
+                else:
+                    since_line = None if self.store else since
+                album_infos = utils.get_album_timeline(browser, since=since_line)
+                if self.store:
+                    album_infos += stored_timeline or []
+                    self.store.set_timeline(url, album_infos)
+            if self.store and since in album_infos:
+                album_infos = album_infos[: album_infos.index(since)]
+        if typed:
+            return RymRecords.CatalogEntry.from_dicts(album_infos)
         return album_infos
 
     def get_albums_timeline(
-        self, urls: List[str] = None, names: List[str] = None
+        self, urls: List[str] = None, names: List[str] = None, typed: bool = False
     ) -> List[List[Dict]]:
-        """Returns a list of dicts containing timeline from several albums."""
+        """Returns a list of lists of dicts (RymRecords.CatalogEntry if typed)
+        containing timeline from several albums."""
         if names:
-            list_albums_timeline = [self.get_album_timeline(name=x) for x in names]
+            urls = self._get_urls_from_album_names(names, "get_album_timeline")
+            list_albums_timeline = self._map(
+                lambda x: self.get_album_timeline(url=urls.get(x)),
+                names,
+                "get_album_timeline",
+            )
         elif urls:
-            list_albums_timeline = [self.get_album_timeline(url=x) for x in urls]
+            list_albums_timeline = self._map(
+                lambda x: self.get_album_timeline(url=x), urls, "get_album_timeline"
+            )
         else:
             raise Exception("No list of urls or names entered. Exiting.")
+
+        if typed:
+            return [
+                RymRecords.CatalogEntry.from_dicts(x) if x is not None else None
+                for x in list_albums_timeline
+            ]
         return list_albums_timeline
 
-    def get_artist_infos(self, url: str = None, name: str = None) -> Dict:
-        """Returns a dict containing artist infos."""
-        if name:
-            url = utils.get_urls_from_artist_name(self.browser, name)[0]
-        if not url:
-            raise Exception("Invalid url or name. Exiting.")
-
-        logger.info("Extracting artist informations for %s.", url)
-        self.browser.get_url(url)
-        artist_infos = utils.get_artist_infos(self.browser.get_soup())
+    def get_artist_infos(
+        self, url: str = None, name: str = None, typed: bool = False
+    ) -> Dict:
+        """Returns a dict (RymRecords.Artist if typed) containing artist infos."""
+        with self._get_browser() as browser:
+            if name:
+                url = utils.get_urls_from_artist_name(browser, name, self.resolver)[0]
+            if not url:
+                raise Exception("Invalid url or name. Exiting.")
+
+            artist_infos = self.store.get_artist(url, self.max_age) if self.store else None
+            if artist_infos is None:
+                logger.info("Extracting artist informations for %s.", url)
+                browser.get_url(url)
+                with self.metrics.timer("parse_seconds", browser.page_type):
+                    artist_infos = utils.get_artist_infos(browser.get_soup())
+                if self.store:
+                    self.store.set_artist(url, artist_infos)
+        if typed:
+            return RymRecords.Artist.from_dict(artist_infos)
         return artist_infos
 
     def get_artists_infos(
-        self, urls: List[str] = None, names: List[str] = None
+        self, urls: List[str] = None, names: List[str] = None, typed: bool = False
     ) -> List[Dict]:
-        """Returns a list of dicts containing infos from several artists."""
+        """Returns a list of dicts (RymRecords.Artist if typed) containing
+        infos from several artists."""
         if names:
-            list_artists_infos = [self.get_artist_infos(name=x) for x in names]
+            list_artists_infos = self._map(
+                lambda x: self.get_artist_infos(name=x), names, "get_artist_infos"
+            )
         elif urls:
-            list_artists_infos = [self.get_artist_infos(url=x) for x in urls]
+            list_artists_infos = self._map(
+                lambda x: self.get_artist_infos(url=x), urls, "get_artist_infos"
+            )
         else:
             raise Exception("No list of urls or names entered. Exiting.")
 
+        if typed:
+            return RymRecords.Artist.from_dicts(list_artists_infos)
         return list_artists_infos
 
-    def get_chart_infos(self, url: RymUrl.RymUrl, max_page: int = None) -> List[Dict]:
+    def get_chart_infos(
+        self,
+        url: Union[str, RymUrl.RymUrl],
+        max_page: int = None,
+        typed: bool = False,
+        max_rank: int = None,
+        min_ratings: int = None,
+    ) -> List[Dict]:
         """Returns a list of dicts containing chart infos.
 
         Parameters:
-            url: An url for a chart. Can be created with the RymUrl helper.
-            See the get_chart.py script in the examples folder for an example.
+            url: An url for a chart (RymUrl or string). Can be created with
+            the RymUrl helper. See the get_chart.py script in the examples
+            folder for an example.
             max_page: The max number of pages to extract from the chart.
+            typed: Return RymRecords.ChartRow instead of dicts.
+            max_rank: Rank of the last row to extract.
+            min_ratings: Min number of ratings of the rows, applied by
+            rateyourmusic with the minr filter of the url.
 
         Returns:
             list_rows: List of dicts for each rows from the chart.
 
+        A page failing to load or parse stops the extraction with a logged
+        error, the rows of the previous pages being returned. url.page is
+        then the failed page, see iter_chart_infos to resume it or to get
+        the exception.
+
+        """
+        url = RymUrl.to_rym_url(url)
+        list_rows = []
+        try:
+            for row in self.iter_chart_infos(
+                url,
+                max_page=max_page,
+                typed=typed,
+                max_rank=max_rank,
+                min_ratings=min_ratings,
+            ):
+                list_rows.append(row)
+        except Exception as e:
+            logger.error(
+                "Chart extraction stopped at page %s, %s rows kept : %s",
+                url.page,
+                len(list_rows),
+                e,
+            )
+        return list_rows
+
+    def iter_chart_infos(
+        self,
+        url: Union[str, RymUrl.RymUrl],
+        max_page: int = None,
+        by_page: bool = False,
+        typed: bool = False,
+        max_rank: int = None,
+        min_ratings: int = None,
+        refresh: bool = False,
+    ) -> Iterator:
+        """Yields the rows of a chart as soon as their page is extracted.
+
+        Parameters:
+            url: An url for a chart. Can be created with the RymUrl helper.
+            max_page: The max number of pages to extract from the chart.
+            by_page: Yield the list of rows of each page instead of the rows.
+            typed: Yield RymRecords.ChartRow instead of dicts.
+            max_rank: Rank of the last row to extract.
+            min_ratings: Min number of ratings of the rows, applied by
+            rateyourmusic with the minr filter of the url.
+            refresh: Load the pages from rateyourmusic, without reading the
+            checkpoint, store and cache. The store is still updated.
+
+        A page failing to load or parse raises its exception, the end of
+        the iteration always being the end of the chart (or of max_page,
+        max_rank). url.page is the page of the last yielded
+        rows, or the failed page after an exception: the extraction is
+        resumed by iterating again on the same url after a failure, or
+        after setting url.page to the following page when the iteration was
+        stopped by the caller. A string url is parsed with RymUrl.from_url,
+        the extraction starting from its page.
+
         """
+        url = RymUrl.to_rym_url(url)
+        self._set_min_ratings(url, min_ratings)
         logger.info("Extracting chart informations for %s.", url)
 
-        list_rows = []
         while True:
             try:
-                self.browser.get_url(url)
-                logger.debug("Extracting chart rows for url %s", url)
-                soup = self.browser.get_soup()
-
-                # table containing albums
-                if soup.find("sections", {"id": "page_sections_charts"}):
-                    logger.debug("Table containing chart elements found")
-                    table = soup.find("section", {"id": "page_charts_section_charts"})
-                    rows = table.find_all(
-                        "div", {"class": "page_section_charts_item_wrapper"}
-                    )
-                    if len(rows) == 0:
-                        logger.debug("No rows extracted. Exiting")
-                        break
-                    for row in rows:
-                        # don't parse ads
-                        if not row.find("script"):
-                            dict_row = utils.get_chart_row_infos(row)
-                            list_rows.append(dict_row)
-                else:
-                    logger.warning("Table class mbgen not found")
-                    break
-
-                # link to the next page
-                if soup.find("a", {"class": "ui_pagination_next"}):
-                    logger.debug("Next page found")
-                    if max_page and url.page == max_page:
-                        break
-                    url.page += 1
-                    soup.decompose()
-                    try:
-                        self.browser.get_url(url)
-                        soup = self.browser.get_soup()
-                    except Exception as e:
-                        logger.error(e)
-                        break
-                else:
-                    logger.debug("No next page found. Exiting.")
-                    break
+                rows, has_next_page = self._get_chart_page(url, refresh)
             except Exception as e:
                 logger.error("Error scraping page %s : %s", url, e)
+                raise
+            rows, stop = self._cut_chart_page(rows, typed, max_rank, min_ratings)
+            if by_page:
+                yield rows
+            else:
+                yield from rows
+            if not has_next_page:
+                logger.debug("No next page found. Exiting.")
+                return
+            if stop:
+                logger.debug("Rank limit reached. Exiting.")
+                return
+            if max_page and url.page == max_page:
+                return
+            url.page += 1
+
+    @staticmethod
+    def _set_min_ratings(url: RymUrl.RymUrl, min_ratings: int = None):
+        """Adds min_ratings to the minr filter of a chart url. The charts
+        being sorted by rating, a page without rows above min_ratings
+        doesn't mean that the next pages have none."""
+        if min_ratings and (url.min_ratings or 0) < min_ratings:
+            url.min_ratings = min_ratings
+
+    @staticmethod
+    def _cut_chart_page(
+        rows: List[Dict], typed: bool, max_rank: int = None, min_ratings: int = None
+    ) -> Tuple[List, bool]:
+        """Returns the rows of a chart page to yield and whether the
+        extraction stops after them."""
+        stop = False
+        if max_rank or min_ratings:
+            rows, stop = utils.cut_chart_rows(rows, max_rank, min_ratings)
+        if typed:
+            rows = RymRecords.ChartRow.from_dicts(rows)
+        return rows, stop
+
+    def get_charts_infos(
+        self,
+        urls: List[Union[str, RymUrl.RymUrl]],
+        max_page: int = None,
+        typed: bool = False,
+        max_rank: int = None,
+        min_ratings: int = None,
+    ) -> Dict[str, List[Dict]]:
+        """Returns the rows of several charts, for example created by
+        RymUrl.get_sweep.
+
+        The same chart is only extracted once, and the charts are spread
+        over all the browsers. See get_chart_infos for the parameters.
+
+        Returns:
+            charts: Dict of the list of rows of each chart, by canonical
+            url of its first page. A chart with a failed page gets None.
+
+        """
+        # the urls of the caller are left on their first page, the same
+        # chart being recognized by its canonical url
+        unique_urls = {}
+        for url in urls:
+            url = RymUrl.to_rym_url(url)
+            unique_urls.setdefault(str(url), copy.copy(url))
+        logger.info("Extracting %s charts.", len(unique_urls))
+
+        def get_chart(url: RymUrl.RymUrl) -> List:
+            chart = str(url)
+            # a failed page raises, the chart getting None
+            rows = list(
+                self.iter_chart_infos(
+                    url,
+                    max_page=max_page,
+                    typed=typed,
+                    max_rank=max_rank,
+                    min_ratings=min_ratings,
+                )
+            )
+            logger.info("%s : %s rows from %s pages.", chart, len(rows), url.page)
+            return rows
+
+        list_charts = self._map(get_chart, list(unique_urls.values()), progress=True)
+        return dict(zip(unique_urls, list_charts))
+
+    def get_chart_delta(
+        self, url: Union[str, RymUrl.RymUrl], snapshot: str, max_page: int = None
+    ) -> Dict[str, List[Dict]]:
+        """Refreshes a chart saved in a snapshot file and returns its changes.
+
+        Pages are extracted in order until one of them is identical to the
+        snapshot (same ranks, releases and rating counts): the following
+        pages are then considered unchanged and taken from the snapshot. The
+        snapshot is updated with the new version of the chart.
+
+        Parameters:
+            url: An url for a chart. Can be created with the RymUrl helper.
+            snapshot: Path of the JSON snapshot of the chart. Created if it
+            doesn't exist.
+            max_page: The max number of pages to extract from the chart, the
+            next pages being kept from the snapshot.
+
+        Returns:
+            delta: Dict with the "new", "removed", "moved" and "changed" rows
+            (see utils.get_chart_delta).
+
+        Raises the exception of a page failing to load or parse, the
+        snapshot being left unchanged.
+
+        """
+        url = RymUrl.to_rym_url(url)
+        # url.page is moved to the last page extracted
+        chart_url = str(url)
+        previous_pages = {}
+        if os.path.exists(snapshot):
+            with open(snapshot, encoding="utf-8") as f:
+                previous_pages = {int(k): v for k, v in json.load(f)["pages"].items()}
+
+        pages = {}
+        # a failed page raises before the snapshot is written, its next pages
+        # aren't considered removed
+        # the pages of the store, checkpoint or cache would be compared to
+        # themselves
+        stopped = False
+        for rows in self.iter_chart_infos(url, by_page=True, refresh=True):
+            pages[url.page] = rows
+            if previous_pages.get(url.page) is not None and utils.is_same_chart_page(
+                previous_pages[url.page], rows
+            ):
+                logger.info("Page %s unchanged, stopping the refresh.", url.page)
+                stopped = True
                 break
+            if max_page and url.page == max_page:
+                stopped = True
+                break
+        if stopped:
+            # the next pages aren't extracted, they are kept from the snapshot
+            # instead of being considered removed
+            pages.update({k: v for k, v in previous_pages.items() if k > url.page})
 
-        return list_rows
+        with open(snapshot, "w", encoding="utf-8") as f:
+            json.dump({"url": chart_url, "pages": pages}, f, ensure_ascii=False)
+
+        return utils.get_chart_delta(
+            [x for _, rows in sorted(previous_pages.items()) for x in rows],
+            [x for _, rows in sorted(pages.items()) for x in rows],
+        )
+
+    def _get_chart_page(
+        self, url: RymUrl.RymUrl, refresh: bool = False
+    ) -> Tuple[List[Dict], bool]:
+        """Returns the rows of the current page of a chart and whether it has a next page."""
+        if refresh:
+            return self._extract_chart_page(url, refresh)
+        return self._checkpointed(
+            "get_chart_page", str(url), lambda: self._extract_chart_page(url)
+        )
+
+    def _extract_chart_page(
+        self, url: RymUrl.RymUrl, refresh: bool = False
+    ) -> Tuple[List[Dict], bool]:
+        if self.store:
+            if not refresh:
+                chart_page = self.store.get_chart_page(str(url), self.chart_max_age)
+                if chart_page is not None:
+                    return chart_page
+            chart_page = self._parse_chart_page(url, refresh)
+            self.store.set_chart_page(str(url), *chart_page)
+            return chart_page
+        return self._parse_chart_page(url, refresh)
+
+    def _parse_chart_page(
+        self, url: RymUrl.RymUrl, refresh: bool = False
+    ) -> Tuple[List[Dict], bool]:
+        with self._get_browser() as browser:
+            browser.get_url(url, use_cache=not refresh)
+            logger.debug("Extracting chart rows for url %s", url)
+            source = browser.get_page_source()
+        with self.metrics.timer("parse_seconds", "chart"):
+            return utils.get_chart_page_infos(source, parser=self.chart_parser)
 
     def get_discography_infos(
         self,
         url: str = None,
         name: str = None,
         complementary_infos: bool = False,
+        typed: bool = False,
     ) -> List[Dict]:
-        """Returns a list of dict containing discography infos."""
-        if name:
-            url = utils.get_urls_from_artist_name(self.browser, name)[0]
-        if not url:
-            raise Exception("Invalid url or name. Exiting.")
-
-        logger.info("Extracting discography informations for %s.", url)
-        self.browser.get_url(url)
-        artist_disco = utils.get_artist_disco(
-            self.browser, self.browser.get_soup(), complementary_infos
-        )
+        """Returns a list of dicts (RymRecords.Release if typed) containing
+        discography infos."""
+        with self._get_browser() as browser:
+            if name:
+                url = utils.get_urls_from_artist_name(browser, name, self.resolver)[0]
+            if not url:
+                raise Exception("Invalid url or name. Exiting.")
+
+            artist_disco = (
+                self.store.get_discography(url, self.max_age) if self.store else None
+            )
+            if artist_disco is None:
+                logger.info("Extracting discography informations for %s.", url)
+                # the "Show all" links of the discography need to be clicked
+                browser.get_url(url, interactive=True, page_type="discography")
+                with self.metrics.timer("parse_seconds", "discography"):
+                    artist_disco = utils.get_artist_disco(
+                        browser, browser.get_soup(), False
+                    )
+                if self.store:
+                    self.store.set_discography(url, artist_disco)
+        if complementary_infos:
+            artist_disco = self._add_complementary_infos(artist_disco)
+        if typed:
+            return RymRecords.Release.from_dicts(artist_disco)
         return artist_disco
 
     def get_discographies_infos(
@@ -190,22 +742,303 @@ class RymNetwork:
         urls: List[str] = None,
         names: List[str] = None,
         complementary_infos: bool = False,
+        typed: bool = False,
     ) -> List[Dict]:
-        """Returns a list of dicts containing infos from several discography."""
-        list_artists_discos = []
+        """Returns a list of dicts (RymRecords.Release if typed) containing
+        infos from several discography."""
         if names:
-            for name in names:
-                artist_disco = self.get_discography_infos(
-                    name=name, complementary_infos=complementary_infos
-                )
-                list_artists_discos.extend(artist_disco)
+            artists_discos = self._map(
+                lambda x: self.get_discography_infos(name=x),
+                names,
+                "get_discography_infos",
+            )
         elif urls:
-            for url in urls:
-                artist_disco = self.get_discography_infos(
-                    url=url, complementary_infos=complementary_infos
-                )
-                list_artists_discos.extend(artist_disco)
+            artists_discos = self._map(
+                lambda x: self.get_discography_infos(url=x),
+                urls,
+                "get_discography_infos",
+            )
         else:
             raise Exception("No list of urls or names entered. Exiting.")
 
+        list_artists_discos = []
+        for artist_disco in artists_discos:
+            if artist_disco:
+                list_artists_discos.extend(artist_disco)
+        if complementary_infos:
+            list_artists_discos = self._add_complementary_infos(list_artists_discos)
+        if typed:
+            return RymRecords.Release.from_dicts(list_artists_discos)
         return list_artists_discos
+
+    def _add_complementary_infos(self, list_discs: List[Dict]) -> List[Dict]:
+        """Adds the complementary infos of their release page to a list of discs.
+
+        Every release page is loaded once, even if it appears in the
+        discography of several artists, and the pages are spread over all the
+        browsers.
+        """
+        years = {}
+        for dict_disc in list_discs:
+            years.setdefault(dict_disc["URL"], dict_disc["Year"])
+        logger.info("Extracting complementary infos for %s releases.", len(years))
+        list_complementary_infos = self._map(
+            lambda x: self._get_complementary_infos(x, years[x]),
+            list(years),
+            "get_complementary_infos",
+            progress=True,
+        )
+        complementary_infos = dict(zip(years, list_complementary_infos))
+        for dict_disc in list_discs:
+            if complementary_infos[dict_disc["URL"]]:
+                dict_disc.update(complementary_infos[dict_disc["URL"]])
+        return list_discs
+
+    def _get_complementary_infos(self, url_disc: str, year: str) -> Dict:
+        if self.store:
+            release_infos = self.store.get_release_infos(url_disc, self.max_age)
+            if release_infos is not None:
+                return release_infos
+        with self._get_browser() as browser:
+            browser.get_url(url_disc)
+            with self.metrics.timer("parse_seconds", browser.page_type):
+                release_infos = utils.get_complementary_infos(browser.get_soup(), year)
+        if self.store:
+            self.store.set_release_infos(url_disc, release_infos)
+        return release_infos
+
+
+class AsyncRymNetwork:
+    """asyncio version of RymNetwork.
+
+    Every method is a coroutine running the blocking RymNetwork code in a
+    thread pool with one thread per browser, so that at most
+    max_concurrency calls run at the same time. The batch methods and
+    get_charts_infos run their RymNetwork version as one call spread over
+    all the browsers, with the same checkpoint.
+
+    Cancelling a coroutine sets a flag checked by the browsers before every
+    page load and click: its thread finishes the page being loaded and
+    stops at the next one, the items of the batch methods not started yet
+    being skipped.
+    """
+
+    def __init__(self, max_concurrency: int = None, **kwargs):
+        """
+        Parameters:
+            max_concurrency: Max number of calls running at the same time.
+            Defaults to the number of workers.
+            kwargs: Arguments of RymNetwork (headless, workers, cache, ...).
+
+        """
+        self.network = RymNetwork(**kwargs)
+        self.max_concurrency = max_concurrency or len(self.network.browsers)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.network.browsers))
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.network.close()
+
+    async def aclose(self):
+        """Runs close in a thread, without blocking the event loop while the
+        running calls finish and the browsers quit."""
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+    async def _run(self, function: Callable, *args, **kwargs):
+        # created here to be bound to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        # the flag of this call, seen by the browsers through the context
+        cancel_event = threading.Event()
+        context = contextvars.copy_context()
+        context.run(RymBrowser.cancel_event.set, cancel_event)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self._executor,
+                    functools.partial(context.run, function, *args, **kwargs),
+                )
+            except asyncio.CancelledError:
+                cancel_event.set()
+                raise
+
+    async def get_album_infos(
+        self, url: str = None, name: str = None, typed: bool = False
+    ) -> Dict:
+        """Returns a dict containing infos for an album."""
+        return await self._run(
+            self.network.get_album_infos, url=url, name=name, typed=typed
+        )
+
+    async def get_albums_infos(
+        self, urls: List[str] = None, names: List[str] = None, typed: bool = False
+    ) -> List[Dict]:
+        """Returns a list of dicts containing infos from several albums."""
+        return await self._run(
+            self.network.get_albums_infos, urls=urls, names=names, typed=typed
+        )
+
+    async def get_album_timeline(
+        self, url: str = None, name: str = None, since: Dict = None, typed: bool = False
+    ) -> List[Dict]:
+        """Returns a list of dicts containing the timeline of an album."""
+        return await self._run(
+            self.network.get_album_timeline, url=url, name=name, since=since, typed=typed
+        )
+
+    async def get_albums_timeline(
+        self, urls: List[str] = None, names: List[str] = None, typed: bool = False
+    ) -> List[List[Dict]]:
+        """Returns a list of dicts containing timeline from several albums."""
+        return await self._run(
+            self.network.get_albums_timeline, urls=urls, names=names, typed=typed
+        )
+
+    async def get_artist_infos(
+        self, url: str = None, name: str = None, typed: bool = False
+    ) -> Dict:
+        """Returns a dict containing artist infos."""
+        return await self._run(
+            self.network.get_artist_infos, url=url, name=name, typed=typed
+        )
+
+    async def get_artists_infos(
+        self, urls: List[str] = None, names: List[str] = None, typed: bool = False
+    ) -> List[Dict]:
+        """Returns a list of dicts containing infos from several artists."""
+        return await self._run(
+            self.network.get_artists_infos, urls=urls, names=names, typed=typed
+        )
+
+    async def iter_chart_infos(
+        self,
+        url: Union[str, RymUrl.RymUrl],
+        max_page: int = None,
+        by_page: bool = False,
+        typed: bool = False,
+        max_rank: int = None,
+        min_ratings: int = None,
+        refresh: bool = False,
+    ) -> AsyncIterator:
+        """Yields the rows of a chart as soon as their page is extracted.
+
+        See RymNetwork.iter_chart_infos.
+        """
+        url = RymUrl.to_rym_url(url)
+        self.network._set_min_ratings(url, min_ratings)
+        logger.info("Extracting chart informations for %s.", url)
+        while True:
+            try:
+                rows, has_next_page = await self._run(
+                    self.network._get_chart_page, url, refresh
+                )
+            except Exception as e:
+                logger.error("Error scraping page %s : %s", url, e)
+                raise
+            rows, stop = self.network._cut_chart_page(rows, typed, max_rank, min_ratings)
+            if by_page:
+                yield rows
+            else:
+                for row in rows:
+                    yield row
+            if not has_next_page or stop or (max_page and url.page == max_page):
+                return
+            url.page += 1
+
+    async def get_chart_infos(
+        self,
+        url: Union[str, RymUrl.RymUrl],
+        max_page: int = None,
+        typed: bool = False,
+        max_rank: int = None,
+        min_ratings: int = None,
+    ) -> List[Dict]:
+        """Returns a list of dicts containing chart infos, the rows of the
+        pages before a failed one. See RymNetwork.get_chart_infos."""
+        url = RymUrl.to_rym_url(url)
+        list_rows = []
+        try:
+            async for row in self.iter_chart_infos(
+                url,
+                max_page=max_page,
+                typed=typed,
+                max_rank=max_rank,
+                min_ratings=min_ratings,
+            ):
+                list_rows.append(row)
+        except Exception as e:
+            logger.error(
+                "Chart extraction stopped at page %s, %s rows kept : %s",
+                url.page,
+                len(list_rows),
+                e,
+            )
+        return list_rows
+
+    async def get_charts_infos(
+        self,
+        urls: List[Union[str, RymUrl.RymUrl]],
+        max_page: int = None,
+        typed: bool = False,
+        max_rank: int = None,
+        min_ratings: int = None,
+    ) -> Dict[str, List[Dict]]:
+        """Returns the rows of several charts, by url. See
+        RymNetwork.get_charts_infos."""
+        return await self._run(
+            self.network.get_charts_infos,
+            urls,
+            max_page=max_page,
+            typed=typed,
+            max_rank=max_rank,
+            min_ratings=min_ratings,
+        )
+
+    async def get_chart_delta(
+        self, url: Union[str, RymUrl.RymUrl], snapshot: str, max_page: int = None
+    ) -> Dict[str, List[Dict]]:
+        """Refreshes a chart saved in a snapshot file and returns its changes.
+        See RymNetwork.get_chart_delta."""
+        return await self._run(
+            self.network.get_chart_delta, url, snapshot, max_page=max_page
+        )
+
+    async def get_discography_infos(
+        self,
+        url: str = None,
+        name: str = None,
+        complementary_infos: bool = False,
+        typed: bool = False,
+    ) -> List[Dict]:
+        """Returns a list of dict containing discography infos."""
+        return await self._run(
+            self.network.get_discography_infos,
+            url=url,
+            name=name,
+            complementary_infos=complementary_infos,
+            typed=typed,
+        )
+
+    async def get_discographies_infos(
+        self,
+        urls: List[str] = None,
+        names: List[str] = None,
+        complementary_infos: bool = False,
+        typed: bool = False,
+    ) -> List[Dict]:
+        """Returns a list of dicts containing infos from several discography."""
+        return await self._run(
+            self.network.get_discographies_infos,
+            urls=urls,
+            names=names,
+            complementary_infos=complementary_infos,
+            typed=typed,
+        )
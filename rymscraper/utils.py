@@ -1,84 +1,195 @@
 import logging
 import re
-import time
-import difflib
 from tqdm import tqdm
-from bs4 import BeautifulSoup, NavigableString, element
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, element
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
-from typing import List
-from rapidfuzz import fuzz, process
+from typing import Dict, List, Optional, Tuple
+from . import RymMatchIndex, RymRecords
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
 
 logger = logging.getLogger(__name__)
 
+PAGINATION_NEXT = re.compile(r"<a[^>]*\bclass=[\"'][^\"']*\bui_pagination_next\b")
+
+# (tag, class) of the chart row elements, by field
+CHART_ROW_FIELDS = {
+    ("div", "page_charts_section_charts_item_credited_links_primary"): "Artist",
+    ("div", "page_charts_section_charts_item_title"): "Album",
+    ("div", "page_charts_section_charts_item_date"): "Date",
+    ("div", "page_charts_section_charts_item_genres_primary"): "Genres",
+    ("span", "page_charts_section_charts_item_details_average_num"): "RYM Rating",
+    ("span", "full"): "full",
+}
+
+
+def get_close_matches_icase(
+    word: str, possibilities: List[str], n: int = 3, cutoff: float = 0.6
+) -> List[str]:
+    """Case-insensitive version of difflib.get_close_matches, matching with
+    RymMatchIndex (cutoff between 0 and 1, best match first). Use
+    RymMatchIndex directly to match many names against the same list."""
+    matches = RymMatchIndex.RymMatchIndex(possibilities).query(
+        word, limit=n, score_cutoff=cutoff * 100
+    )
+    return [x[0] for x in matches]
 
-def get_close_matches_icase(word, possibilities, *args, **kwargs):
-    """Case-insensitive version of difflib.get_close_matches"""
-    lword = word.lower()
-    lpos = {p.lower(): p for p in possibilities}
-    lmatch = difflib.get_close_matches(lword, lpos.keys(), *args, **kwargs)
-    if not lmatch:
-        best_match = process.extractOne(lword, lpos.keys(), scorer=fuzz.WRatio, score_cutoff=85)
-        if best_match:
-            lmatch = [best_match[0]]
 
-    return [lpos[m] for m in lmatch]
+def get_urls_from_artist_name(browser, artist: str, resolver=None) -> List[str]:
+    """Returns a list of urls for all results for an artist name on rateyourmusic.
 
-def get_urls_from_artist_name(browser, artist: str) -> List[str]:
-    """Returns a list of urls for all results for an artist name on rateyourmusic."""
+    The results whose name matches artist (see RymMatchIndex) come first,
+    best match first, followed by the others in the order of the search.
+    resolver is an optional RymResolver caching the results.
+    """
+    if resolver:
+        urls_artist = resolver.get_artist_urls(artist)
+        if urls_artist is not None:
+            logger.debug("URLs for %s found in the resolver : %s", artist, urls_artist)
+            return urls_artist
     base_url = "https://rateyourmusic.com"
-    artist = artist.strip().replace(" ", "+")
-    url = f"{base_url}/search?searchtype=a&searchterm={artist}"
-    logger.debug("Searching %s in url %s", artist, url)
+    search_term = artist.strip().replace(" ", "+")
+    url = f"{base_url}/search?searchtype=a&searchterm={search_term}"
+    logger.debug("Searching %s in url %s", search_term, url)
     browser.get_url(url)
     soup = browser.get_soup()
-    urls_artist = [f"{base_url}{link['href']}" for link in soup.find_all('a', {'class': 'searchpage'})]
-    logger.debug("URLs for %s found : %s", artist, urls_artist)
+    links = soup.find_all('a', {'class': 'searchpage'})
+    urls_artist = [f"{base_url}{link['href']}" for link in links]
+    # the results matching the searched name first, best match first
+    matches = RymMatchIndex.RymMatchIndex(
+        [link.text.strip() for link in links], urls_artist
+    ).query(artist, limit=None)
+    matched_urls = [x[2] for x in matches]
+    urls_artist = matched_urls + [x for x in urls_artist if x not in matched_urls]
+    logger.debug("URLs for %s found : %s", search_term, urls_artist)
+    if resolver and urls_artist:
+        resolver.set_artist_urls(artist, urls_artist)
     return urls_artist
 
-def get_url_from_album_name(browser, name: str) -> str:
-    """Returns the url of an album."""
-    album_name = name.split(" - ")[1].strip()
-    artist_name = name.split(" - ")[0].strip()
-    artist_urls = get_urls_from_artist_name(browser, artist_name)
 
-    logger.debug("Searching for %s at %s", album_name, artist_urls[0])
-    browser.get_url(artist_urls[0])
+def get_artist_album_index(browser, artist_url: str, resolver=None) -> List[List[str]]:
+    """Returns the [name, url] of the albums of an artist."""
+    if resolver:
+        album_index = resolver.get_album_index(artist_url)
+        if album_index is not None:
+            return album_index
+    browser.get_url(artist_url)
     soup = browser.get_soup()
-    artist_album_list = [
+    album_index = [
         [x.text.strip(), "https://rateyourmusic.com" + x.find("a")["href"]]
         for x in soup.find_all("div", {"class": "disco_mainline"})
     ]
-    artist_album_url = [x[1] for x in artist_album_list]
-    artist_album_name = [x[0] for x in artist_album_list]
+    if resolver:
+        resolver.set_album_index(artist_url, album_index)
+    return album_index
+
+
+def get_artist_match_index(
+    browser, artist_url: str, resolver=None
+) -> RymMatchIndex.RymMatchIndex:
+    """Returns a RymMatchIndex of the albums of an artist, values being their urls."""
+    if resolver:
+        match_index = resolver.get_match_index(artist_url)
+        if match_index is not None:
+            return match_index
+    album_index = get_artist_album_index(browser, artist_url, resolver)
+    match_index = RymMatchIndex.RymMatchIndex(
+        [x[0] for x in album_index], [x[1] for x in album_index]
+    )
+    if resolver:
+        resolver.set_match_index(artist_url, match_index)
+    return match_index
 
-    matches = process.extract(album_name, artist_album_name)
-    if matches and matches[0][1] >= 90:  # you may adjust the threshold as needed
-        best_match_url = artist_album_url[artist_album_name.index(matches[0][0])]
-        logger.debug("Best match : %s", best_match_url)
-        return best_match_url
 
-    # If we haven't found a good match yet, consider other URLs
-    for artist_url in artist_urls[1:]:
-        logger.debug("Searching for %s at %s", album_name, artist_url)
-        browser.get_url(artist_url)
-        soup = browser.get_soup()
-        artist_album_list = [
-            [x.text.strip(), "https://rateyourmusic.com" + x.find("a")["href"]]
-            for x in soup.find_all("div", {"class": "disco_mainline"})
-        ]
-        artist_album_url = [x[1] for x in artist_album_list]
-        artist_album_name = [x[0] for x in artist_album_list]
+def get_url_from_album_name(browser, name: str, resolver=None) -> str:
+    """Returns the url of an album.
+
+    resolver is an optional RymResolver caching the artist lookups.
+    """
+    artist_name, album_name = split_album_name(name)
+    artist_urls = get_urls_from_artist_name(browser, artist_name, resolver)
 
-        matches = process.extract(album_name, artist_album_name)
-        if matches and matches[0][1] >= 90:  # you may adjust the threshold as needed
-            best_match_url = artist_album_url[artist_album_name.index(matches[0][0])]
-            logger.debug("Best match : %s", best_match_url)
-            return best_match_url
+    # If we haven't found a good match in the first url, consider the other ones
+    for artist_url in artist_urls:
+        logger.debug("Searching for %s at %s", album_name, artist_url)
+        match = get_artist_match_index(browser, artist_url, resolver).best(album_name)
+        if match:
+            logger.debug("Best match : %s", match[2])
+            return match[2]
 
     logger.error("Could not find a match for album '%s' from artist '%s'", album_name, artist_name)
     return None
 
 
+def split_album_name(name: str) -> Tuple[str, str]:
+    """Returns the artist and the album of a name in the "Artist - Album" format."""
+    parts = name.split(" - ")
+    if len(parts) < 2:
+        raise Exception(f'{name} is not in the "Artist - Album" format. Exiting.')
+    return parts[0].strip(), parts[1].strip()
+
+
+def group_album_names(names: List[str]) -> Dict[str, List[str]]:
+    """Groups names in the "Artist - Album" format by artist.
+
+    The keys are the artist names as first written in names. Names not in
+    this format are left out.
+    """
+    groups = {}
+    artist_names = {}
+    for name in names:
+        try:
+            artist_name = split_album_name(name)[0]
+        except Exception as e:
+            logger.error(e)
+            continue
+        key = " ".join(artist_name.lower().split())
+        artist_names.setdefault(key, artist_name)
+        groups.setdefault(artist_names[key], []).append(name)
+    return groups
+
+
+def get_urls_from_artist_album_names(
+    browser, artist_name: str, names: List[str], resolver=None
+) -> List[Optional[str]]:
+    """Returns the urls of several albums of the same artist.
+
+    The artist is searched once and all the albums are matched at once
+    against the match index of each artist page.
+
+    Parameters:
+        artist_name: Name of the artist.
+        names: Names of the albums in the "Artist - Album" format.
+        resolver: Optional RymResolver caching the artist lookups.
+
+    """
+    album_names = [split_album_name(x)[1] for x in names]
+    urls = [None] * len(names)
+    artist_urls = get_urls_from_artist_name(browser, artist_name, resolver)
+
+    # If we haven't found a good match in the first url, consider the other ones
+    for artist_url in artist_urls:
+        remaining = [i for i, url in enumerate(urls) if url is None]
+        if not remaining:
+            break
+        logger.debug("Searching for %s albums at %s", len(remaining), artist_url)
+        match_index = get_artist_match_index(browser, artist_url, resolver)
+        matches = match_index.query_many([album_names[i] for i in remaining])
+        for i, match in zip(remaining, matches):
+            if match:
+                urls[i] = match[2]
+                logger.debug("Best match for %s : %s", names[i], urls[i])
+
+    for name, url in zip(names, urls):
+        if url is None:
+            logger.error("Could not find a match for album '%s'", name)
+    return urls
+
+
 def get_album_infos(soup: BeautifulSoup) -> dict:
     """Returns a dict containing infos from an album."""
     album_title_text = soup.find("div", {"class": "album_title"}).text.split("\n")
@@ -135,18 +246,33 @@ def parse_catalog_line(row: element.Tag) -> dict:
     }
 
 
-def get_album_timeline(browser) -> List[dict]:
-    """Returns a list of dict containing the timeline of the notes of an album."""
+def get_album_timeline(browser, since: dict = None, timeout: float = None) -> List[dict]:
+    """Returns a list of dict containing the timeline of the notes of an album.
+
+    Parameters:
+        browser: Browser on the page of the album.
+        since: Last catalog line already extracted (dict with "Date" and
+        "User", most recent first). The pages are only read until this line,
+        so that only the newer lines are returned.
+        timeout: Max duration in seconds of the loading of a timeline page,
+        the wait_timeout of the browser by default.
+
+    """
     catalog_list = []
     while True:
         soup = browser.get_soup()
         catalog_lines = soup.find(
             "div", {"class": "catalog_list", "id": "catalog_list"}
         )
-        catalog_list += [
-            parse_catalog_line(x)
-            for x in catalog_lines.findAll("div", {"class": "catalog_line"})
-        ]
+        for line in catalog_lines.findAll("div", {"class": "catalog_line"}):
+            catalog_line = parse_catalog_line(line)
+            if since and (catalog_line["Date"], catalog_line["User"]) == (
+                since["Date"],
+                since["User"],
+            ):
+                logger.debug("Extracting timeline : last seen line reached.")
+                return catalog_list
+            catalog_list.append(catalog_line)
         if (
             len(
                 browser.find_element(By.CLASS_NAME, "catalog_section").find_elements(
@@ -159,11 +285,21 @@ def get_album_timeline(browser) -> List[dict]:
         browser.execute_script(
             "document.getElementsByClassName('navlinknext')[1].scrollIntoView(true);"
         )
-        browser.find_element(By.CLASS_NAME, "catalog_section").find_element(
-            By.CLASS_NAME, "navlinknext"
-        ).click()
         logger.debug("Extracting timeline : %s items found.", len(catalog_list))
-        time.sleep(2)
+        # the next page replaces the catalog
+        try:
+            browser.click_and_wait(
+                browser.find_element(By.CLASS_NAME, "catalog_section").find_element(
+                    By.CLASS_NAME, "navlinknext"
+                ),
+                watched=browser.find_element(By.ID, "catalog_list"),
+                timeout=timeout,
+                name="timeline",
+            )
+        except TimeoutException:
+            raise Exception(
+                f"Timeline page not loaded after {timeout or browser.wait_timeout} seconds. Exiting."
+            )
     return catalog_list
 
 
@@ -202,8 +338,49 @@ def get_artist_infos(soup: BeautifulSoup) -> dict:
     return artist_infos
 
 
+def get_chart_page_infos(source: str, parser: str = "lxml") -> Tuple[List[dict], bool]:
+    """Returns the rows of a chart page and whether it has a next page.
+
+    Only the chart section of the page is parsed. parser can be "lxml" or
+    "selectolax" (faster, needs the selectolax package).
+    """
+    has_next_page = bool(PAGINATION_NEXT.search(source))
+    if parser == "selectolax":
+        return _get_chart_page_infos_selectolax(source), has_next_page
+
+    soup = BeautifulSoup(
+        source,
+        "lxml",
+        parse_only=SoupStrainer("sections", {"id": "page_sections_charts"}),
+    )
+    # table containing albums
+    if not soup.find("sections", {"id": "page_sections_charts"}):
+        logger.warning("Table class mbgen not found")
+        return [], False
+    logger.debug("Table containing chart elements found")
+    table = soup.find("section", {"id": "page_charts_section_charts"})
+    rows = table.find_all("div", {"class": "page_section_charts_item_wrapper"})
+    if len(rows) == 0:
+        logger.debug("No rows extracted. Exiting")
+        return [], False
+    # don't parse ads
+    list_rows = [get_chart_row_infos(row) for row in rows if not row.find("script")]
+    return list_rows, has_next_page
+
+
 def get_chart_row_infos(row: element.Tag) -> dict:
     """Returns a dict containing infos from a chart row."""
+    # find every field of the row in a single traversal
+    fields = {}
+    full_spans = []
+    for tag in row.find_all(True):
+        for class_name in tag.get("class") or ():
+            field = CHART_ROW_FIELDS.get((tag.name, class_name))
+            if field == "full":
+                full_spans.append(tag)
+            elif field and field not in fields:
+                fields[field] = tag
+
     dict_row = {}
     try:
         dict_row["Rank"] = row.get("id").replace("pos", "")
@@ -211,10 +388,7 @@ def get_chart_row_infos(row: element.Tag) -> dict:
         logger.error("Error when fetching Rank: %s", e)
         dict_row["Rank"] = "NA"
     try:
-        artist_div = dict_row["Artist"] = row.find(
-            "div",
-            {"class": "page_charts_section_charts_item_credited_links_primary"},
-        )
+        artist_div = fields["Artist"]
         romanized_version_span = artist_div.find(
             "span", {"class": "ui_name_locale_language"}
         )
@@ -237,10 +411,7 @@ def get_chart_row_infos(row: element.Tag) -> dict:
         logger.error("Error when fetching Artist: %s", e)
         dict_row["Artist"] = "NA"
     try:
-        dict_row["Album"] = row.find(
-            "div",
-            {"class": "page_charts_section_charts_item_title"},
-        ).text.replace("\n", "")
+        dict_row["Album"] = fields["Album"].text.replace("\n", "")
         logger.debug(
             "%s - %s - %s",
             dict_row["Rank"],
@@ -252,54 +423,173 @@ def get_chart_row_infos(row: element.Tag) -> dict:
         dict_row["Album"] = "NA"
     try:
         dict_row["Date"] = (
-            row.find("div", {"class": "page_charts_section_charts_item_date"})
-            .find_all("span")[0]
-            .text.replace("\n", "")
-            .strip()
+            fields["Date"].find("span").text.replace("\n", "").strip()
         )
     except Exception as e:
         logger.error("Error when fetching Date: %s", e)
         dict_row["Date"] = "NA"
     try:
         dict_row["Genres"] = ", ".join(
-            [
-                x.text
-                for x in row.find(
-                    "div", {"class": "page_charts_section_charts_item_genres_primary"}
-                ).find_all("a", {"class": "genre"})
-            ]
+            [x.text for x in fields["Genres"].find_all("a", {"class": "genre"})]
         )
     except Exception as e:
         logger.error("Error when fetching Genres: %s", e)
         dict_row["Genres"] = "NA"
     try:
-        dict_row["RYM Rating"] = row.find(
-            "span", {"class": "page_charts_section_charts_item_details_average_num"}
-        ).text
+        dict_row["RYM Rating"] = fields["RYM Rating"].text
     except Exception as e:
         logger.error("Error when fetching RYM Rating: %s", e)
         dict_row["RYM Rating"] = "NA"
     try:
-        dict_row["Ratings"] = (
-            row.find_all("span", {"class": "full"})[0]
-            .text.replace("\n", "")
-            .replace(" ", "")
-        )
+        dict_row["Ratings"] = full_spans[0].text.replace("\n", "").replace(" ", "")
     except Exception as e:
         logger.error("Error when fetching Ratings: %s", e)
         dict_row["Ratings"] = "NA"
     try:
-        dict_row["Reviews"] = (
-            row.find_all("span", {"class": "full"})[1]
-            .text.replace("\n", "")
-            .replace(" ", "")
-        )
+        dict_row["Reviews"] = full_spans[1].text.replace("\n", "").replace(" ", "")
     except Exception as e:
         logger.error("Error when fetching Reviews: %s", e)
         dict_row["Reviews"] = "NA"
     return dict_row
 
 
+def cut_chart_rows(
+    rows: List[dict], max_rank: int = None, min_ratings: int = None
+) -> Tuple[List[dict], bool]:
+    """Returns the rows of a chart page up to max_rank with at least
+    min_ratings ratings, and whether the following pages can be skipped
+    (max_rank reached). The charts being sorted by rating, the rows of the
+    next pages can have more ratings."""
+    kept_rows = []
+    for row in rows:
+        rank = RymRecords.parse_int(row["Rank"])
+        if max_rank and rank is not None and rank > max_rank:
+            return kept_rows, True
+        ratings = RymRecords.parse_int(row["Ratings"])
+        if min_ratings and ratings is not None and ratings < min_ratings:
+            continue
+        kept_rows.append(row)
+    last_rank = RymRecords.parse_int(rows[-1]["Rank"]) if rows else None
+    stop = bool(max_rank and last_rank is not None and last_rank >= max_rank)
+    return kept_rows, stop
+
+
+def get_chart_row_key(row: dict) -> Tuple[str, str]:
+    """Returns the key identifying the release of a chart row."""
+    return row["Artist"], row["Album"]
+
+
+def is_same_chart_page(previous_rows: List[dict], rows: List[dict]) -> bool:
+    """Returns True if two versions of a chart page have the same ranks,
+    releases and rating counts."""
+    fields = ["Rank", "Artist", "Album", "Ratings", "Reviews"]
+    return [[x[f] for f in fields] for x in previous_rows] == [
+        [x[f] for f in fields] for x in rows
+    ]
+
+
+def get_chart_delta(previous_rows: List[dict], rows: List[dict]) -> Dict[str, List[dict]]:
+    """Returns the differences between two versions of a chart.
+
+    Returns:
+        delta: Dict with the "new" and "removed" rows, the rows whose rank
+        "moved" and the rows whose rating, ratings or reviews "changed". The
+        moved and changed rows also contain the previous values, prefixed
+        with "Previous ".
+
+    """
+    previous = {get_chart_row_key(x): x for x in previous_rows}
+    current = {get_chart_row_key(x): x for x in rows}
+    delta = {"new": [], "removed": [], "moved": [], "changed": []}
+    for key, row in current.items():
+        previous_row = previous.get(key)
+        if previous_row is None:
+            delta["new"].append(row)
+            continue
+        if row["Rank"] != previous_row["Rank"]:
+            delta["moved"].append({**row, "Previous Rank": previous_row["Rank"]})
+        changes = {
+            f"Previous {x}": previous_row[x]
+            for x in ["RYM Rating", "Ratings", "Reviews"]
+            if row[x] != previous_row[x]
+        }
+        if changes:
+            delta["changed"].append({**row, **changes})
+    delta["removed"] = [x for key, x in previous.items() if key not in current]
+    return delta
+
+
+def _get_chart_page_infos_selectolax(source: str) -> List[dict]:
+    """selectolax version of the chart parsing, returns the same dicts."""
+    if HTMLParser is None:
+        raise Exception("The selectolax parser needs the selectolax package.")
+    tree = HTMLParser(source)
+    table = tree.css_first("sections#page_sections_charts")
+    if table is None:
+        logger.warning("Table class mbgen not found")
+        return []
+    list_rows = []
+    for row in table.css(
+        "section#page_charts_section_charts div.page_section_charts_item_wrapper"
+    ):
+        # don't parse ads
+        if row.css_first("script") is not None:
+            continue
+        dict_row = {"Rank": (row.attributes.get("id") or "NA").replace("pos", "")}
+
+        artist_div = row.css_first(
+            "div.page_charts_section_charts_item_credited_links_primary"
+        )
+        if artist_div is None:
+            dict_row["Artist"] = "NA"
+        else:
+            romanized_version_span = artist_div.css_first("span.ui_name_locale_language")
+            original_name_span = artist_div.css_first("span.ui_name_locale_original")
+            if romanized_version_span is not None and original_name_span is not None:
+                artist = f"{_text(romanized_version_span)} [{_text(original_name_span)}]"
+            elif romanized_version_span is not None:
+                artist = "NA"
+            elif original_name_span is not None:
+                artist = _text(original_name_span)
+            else:
+                artist = _text(artist_div)
+            dict_row["Artist"] = artist.replace("\n", "")
+
+        title_div = row.css_first("div.page_charts_section_charts_item_title")
+        dict_row["Album"] = _text(title_div).replace("\n", "") if title_div else "NA"
+
+        date_span = row.css_first("div.page_charts_section_charts_item_date span")
+        dict_row["Date"] = (
+            _text(date_span).replace("\n", "").strip() if date_span else "NA"
+        )
+
+        genres_div = row.css_first("div.page_charts_section_charts_item_genres_primary")
+        dict_row["Genres"] = (
+            ", ".join([_text(x) for x in genres_div.css("a.genre")])
+            if genres_div
+            else "NA"
+        )
+
+        rating_span = row.css_first(
+            "span.page_charts_section_charts_item_details_average_num"
+        )
+        dict_row["RYM Rating"] = _text(rating_span) if rating_span else "NA"
+
+        full_spans = row.css("span.full")
+        for index, key in enumerate(["Ratings", "Reviews"]):
+            dict_row[key] = (
+                _text(full_spans[index]).replace("\n", "").replace(" ", "")
+                if len(full_spans) > index
+                else "NA"
+            )
+        list_rows.append(dict_row)
+    return list_rows
+
+
+def _text(node) -> str:
+    return node.text(deep=True, separator="", strip=False)
+
+
 def get_artist_disco(
     browser, soup: BeautifulSoup, complementary_infos: bool
 ) -> List[dict]:
@@ -318,7 +608,7 @@ def get_artist_disco(
         discs = section.find_next_sibling(
             "div", {"id": re.compile("disco_type_*")}
         ).find_all("div", {"class": "disco_release"})
-        for disc in tqdm(discs, dynamic_ncols=True):
+        for disc in tqdm(discs, dynamic_ncols=True, disable=not complementary_infos):
             album = disc.find("a", {"class", "album"})
             url_disc = "https://rateyourmusic.com" + album["href"]
             date = disc.find("span", {"class": re.compile("disco_year_*")})
@@ -353,36 +643,40 @@ def get_complementary_infos_disc(browser, dict_disc: dict, url_disc: str) -> dic
     """Returns a dict containing complementary informations for a disc."""
     try:
         browser.get_url(url_disc)
-        soup = browser.get_soup()
-        dict_complementary = {}
-        table = soup.find("table", {"class": "album_info"})
-        table_descriptors = [x.find("th").text.strip() for x in table.find_all("tr")]
-        table_values = [
-            " ".join(x.find("td").text.strip().replace("\n", ", ").split())
-            for x in table.find_all("tr")
-        ]
-        for d, v in zip(table_descriptors, table_values):
-            dict_complementary[d] = v
-
-        try:
-            dict_complementary["Rank Overall"] = [
-                x.replace("#", "").replace(",", "")
-                for y in dict_complementary["Ranked"].split(", ")
-                if "overall" in y
-                for x in y.split()
-            ][0]
-        except Exception as e:
-            logger.debug("No overall rank found : %s", e)
-        try:
-            dict_complementary["Rank Year"] = [
-                x.replace("#", "").replace(",", "")
-                for y in dict_complementary["Ranked"].split(", ")
-                if dict_disc["Year"] in y
-                for x in y.split()
-            ][0]
-        except Exception as e:
-            logger.debug("No year rank found : %s", e)
-        dict_disc.update(dict_complementary)
+        dict_disc.update(get_complementary_infos(browser.get_soup(), dict_disc["Year"]))
     except Exception as e:
         logger.error(e)
     return dict_disc
+
+
+def get_complementary_infos(soup: BeautifulSoup, year: str) -> dict:
+    """Returns a dict containing the complementary informations of a release page."""
+    dict_complementary = {}
+    table = soup.find("table", {"class": "album_info"})
+    table_descriptors = [x.find("th").text.strip() for x in table.find_all("tr")]
+    table_values = [
+        " ".join(x.find("td").text.strip().replace("\n", ", ").split())
+        for x in table.find_all("tr")
+    ]
+    for d, v in zip(table_descriptors, table_values):
+        dict_complementary[d] = v
+
+    try:
+        dict_complementary["Rank Overall"] = [
+            x.replace("#", "").replace(",", "")
+            for y in dict_complementary["Ranked"].split(", ")
+            if "overall" in y
+            for x in y.split()
+        ][0]
+    except Exception as e:
+        logger.debug("No overall rank found : %s", e)
+    try:
+        dict_complementary["Rank Year"] = [
+            x.replace("#", "").replace(",", "")
+            for y in dict_complementary["Ranked"].split(", ")
+            if year in y
+            for x in y.split()
+        ][0]
+    except Exception as e:
+        logger.debug("No year rank found : %s", e)
+    return dict_complementary
@@ -28,4 +28,8 @@ setuptools.setup(
         "tqdm",
         "rapidfuzz",
     ],
+    extras_require={
+        "fast": ["selectolax"],
+        "export": ["pyarrow"],
+    },
 )
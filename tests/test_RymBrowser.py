@@ -0,0 +1,99 @@
+from rymscraper import RymBrowser, RymScheduler
+from selenium import webdriver
+
+URL = "https://rateyourmusic.com/artist/pinback"
+RATE_LIMITED_PAGE = '<html><form id="sec_verify"></form></html>'
+
+
+def make_browser(**kwargs):
+    """Returns a RymBrowser whose firefox calls are replaced by stubs."""
+    browser = RymBrowser.RymBrowser(
+        scheduler=RymScheduler.RymScheduler(backoff_base=0, max_retries=2), **kwargs
+    )
+    browser.launches = 0
+
+    def start():
+        browser.launches += 1
+        browser.started = True
+
+    def quit():
+        browser.started = False
+
+    browser.start = start
+    browser.quit = quit
+    return browser
+
+
+def test_RymBrowserRestartAfterRetries():
+    browser = make_browser()
+    browser.start()
+
+    def navigate(url):
+        browser.source = RATE_LIMITED_PAGE
+
+    browser.navigate = navigate
+    browser.execute_script = lambda script, *args: [1, len(RATE_LIMITED_PAGE)]
+    try:
+        browser.get_url(URL)
+    except Exception:
+        pass
+    else:
+        raise AssertionError()
+    if browser.metrics.get("rate_limits") != 3 or browser.metrics.get("restarts") != 1:
+        raise AssertionError()
+    if browser.launches != 2 or not browser.started:
+        raise AssertionError()
+
+
+def make_session_browser(monkeypatch, session):
+    """Returns a RymBrowser whose firefox is replaced by an in-memory page."""
+    monkeypatch.setattr(webdriver.Firefox, "__init__", lambda self, options=None: None)
+    monkeypatch.setattr(webdriver.Firefox, "quit", lambda self: None)
+    browser = RymBrowser.RymBrowser(session=session)
+    browser.cookies = []
+    browser.local_storage = {}
+    browser.loaded = []
+    browser.get = browser.loaded.append
+    browser.get_cookies = lambda: list(browser.cookies)
+    browser.add_cookie = browser.cookies.append
+
+    def execute_script(script, *args):
+        if args:
+            browser.local_storage.update(args[0])
+        return dict(browser.local_storage)
+
+    browser.execute_script = execute_script
+    return browser
+
+
+def test_RymBrowserSession(tmp_path, monkeypatch):
+    session = str(tmp_path / "session.json")
+    browser = make_session_browser(monkeypatch, session)
+    browser.start()
+    if browser.consent or browser.loaded:
+        raise AssertionError()
+    # popups accepted during the navigation
+    browser.cookies.append({"name": "consent", "value": "1"})
+    browser.local_storage["theme"] = "dark"
+    browser.consent = True
+    browser.quit()
+
+    restored = make_session_browser(monkeypatch, session)
+    restored.start()
+    if restored.loaded != [RymBrowser.SESSION_URL]:
+        raise AssertionError()
+    if restored.cookies != [{"name": "consent", "value": "1"}]:
+        raise AssertionError()
+    if restored.local_storage != {"theme": "dark"} or not restored.consent:
+        raise AssertionError()
+
+
+def test_RymBrowserConsentReset(monkeypatch):
+    browser = make_session_browser(monkeypatch, None)
+    browser.start()
+    browser.consent = True
+    browser.quit()
+    # a new blank firefox shows the popups again
+    browser.start()
+    if browser.consent:
+        raise AssertionError()
@@ -0,0 +1,53 @@
+from rymscraper import RymCache
+
+
+def test_RymCacheHitMiss(tmp_path):
+    cache = RymCache.RymCache(path=str(tmp_path / "cache.sqlite"))
+    url = "https://rateyourmusic.com/artist/pinback"
+
+    if cache.get(url) is not None:
+        raise AssertionError()
+
+    cache.set(url, "<html>pinback</html>")
+
+    # same page with another spelling of the url
+    if cache.get("https://RateYourMusic.com/artist/pinback/#top") != "<html>pinback</html>":
+        raise AssertionError()
+
+    if cache.stats()["hits"] != 1 or cache.stats()["misses"] != 1:
+        raise AssertionError()
+
+
+def test_RymCacheTTL(tmp_path):
+    cache = RymCache.RymCache(path=str(tmp_path / "cache.sqlite"), ttls={"chart": 0})
+    url = "https://rateyourmusic.com/charts/top/album/all-time/1/"
+    cache.set(url, "<html>chart</html>")
+
+    if cache.get(url) is not None:
+        raise AssertionError()
+
+    cache.offline = True
+    if cache.get(url) != "<html>chart</html>":
+        raise AssertionError()
+
+
+def test_RymCacheEviction(tmp_path):
+    cache = RymCache.RymCache(path=str(tmp_path / "cache.sqlite"), max_size=200)
+    urls = [f"https://rateyourmusic.com/artist/{i}" for i in range(20)]
+    for url in urls:
+        cache.set(url, url * 10)
+
+    if cache.stats()["size"] > 200:
+        raise AssertionError()
+
+    if cache.get(urls[0]) is not None or cache.get(urls[-1]) is None:
+        raise AssertionError()
+
+
+def test_normalize_chart_url():
+    if RymCache.normalize_url(
+        "https://rateyourmusic.com/charts/top/album/all-time/g:Rock,ambient/"
+    ) != RymCache.normalize_url(
+        "https://rateyourmusic.com/charts/top/album/all-time/g:ambient,rock/1/"
+    ):
+        raise AssertionError()
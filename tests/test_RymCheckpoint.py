@@ -0,0 +1,28 @@
+from rymscraper import RymCheckpoint
+
+
+def test_RymCheckpointResume(tmp_path):
+    path = str(tmp_path / "checkpoint.jsonl")
+    checkpoint = RymCheckpoint.RymCheckpoint(path)
+    checkpoint.add("get_album_infos", "url1", {"Name": "Album 1"})
+    checkpoint.add_failure("get_album_infos", "url2", "IP banned")
+    checkpoint.close()
+
+    # interrupted write
+    with open(path, "a") as f:
+        f.write('{"method": "get_album_infos", "key": "url3", "ok": tr')
+
+    checkpoint = RymCheckpoint.RymCheckpoint(path)
+
+    if checkpoint.get("get_album_infos", "url1") != {"Name": "Album 1"}:
+        raise AssertionError()
+
+    if checkpoint.is_done("get_album_infos", "url2"):
+        raise AssertionError()
+
+    if checkpoint.failures() != [("get_album_infos", "url2", "IP banned")]:
+        raise AssertionError()
+
+    checkpoint.add("get_album_infos", "url2", {"Name": "Album 2"})
+    if checkpoint.failures():
+        raise AssertionError()
@@ -0,0 +1,87 @@
+import csv
+import pytest
+from rymscraper import RymExport
+
+ROWS = [
+    {
+        "Rank": str(rank),
+        "Artist": f"Artist {rank}",
+        "Album": f"Album {rank}",
+        "Date": "15 March 2015",
+        "Genres": "Jazz Rap, Conscious Hip Hop",
+        "RYM Rating": "4.20",
+        "Ratings": "1000",
+        "Reviews": "NA",
+    }
+    for rank in range(1, 6)
+]
+
+
+def test_RymExporterCsvAppend(tmp_path):
+    path = str(tmp_path / "chart.csv")
+    RymExport.export(ROWS[:3], path, batch_size=2)
+    RymExport.export(ROWS[3:], path, append=True)
+    with open(path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f, delimiter="\t"))
+    if rows != ROWS:
+        raise AssertionError()
+
+
+def test_RymExporterParquetAppend(tmp_path):
+    pytest.importorskip("pyarrow")
+    import pyarrow.dataset
+
+    path = str(tmp_path / "chart.parquet")
+    RymExport.export(ROWS[:3], path, batch_size=2)
+    RymExport.export(ROWS[3:], path, append=True)
+    parts = RymExport.get_parts(path)
+    if parts != [path, str(tmp_path / "chart-00001.parquet")]:
+        raise AssertionError()
+    table = pyarrow.dataset.dataset(parts).to_table()
+    if table.column("Rank").to_pylist() != [1, 2, 3, 4, 5]:
+        raise AssertionError()
+    if table.column("Genres").to_pylist()[0] != ["Jazz Rap", "Conscious Hip Hop"]:
+        raise AssertionError()
+
+
+ALBUM = {
+    "Name": "Summer in Abaddon",
+    "Artist": "Pinback",
+    "Type": "Album",
+    "Released": "12 October 2004",
+    "RYM Rating": "3.61 / 5.0 from 7,890 ratings",
+    "Genres": "Indie Rock, Math Rock\nSlowcore",
+    "Descriptors": "melancholic, rhythmic",
+    "Track listing": ["Non-Photo Blue", "Syracuse"],
+}
+
+
+def test_RymExporterAlbumCsv(tmp_path):
+    path = str(tmp_path / "album.csv")
+    RymExport.export([ALBUM], path, "album")
+    with open(path, newline="", encoding="utf-8") as f:
+        row = next(csv.DictReader(f, delimiter="\t"))
+    if row["Rating"] != "3.61" or row["Ratings"] != "7890":
+        raise AssertionError()
+    if row["Primary Genres"] != "Indie Rock, Math Rock":
+        raise AssertionError()
+    if row["Secondary Genres"] != "Slowcore" or row["Released"] != "12 October 2004":
+        raise AssertionError()
+
+
+def test_RymExporterAlbumParquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    import datetime
+    import pyarrow.parquet
+
+    path = str(tmp_path / "album.parquet")
+    RymExport.export([ALBUM], path, "album")
+    row = pyarrow.parquet.read_table(path).to_pylist()[0]
+    if row["Rating"] != 3.61 or row["Ratings"] != 7890:
+        raise AssertionError()
+    if row["Released"] != datetime.date(2004, 10, 12):
+        raise AssertionError()
+    if row["Primary Genres"] != ["Indie Rock", "Math Rock"]:
+        raise AssertionError()
+    if row["Secondary Genres"] != ["Slowcore"] or row["Descriptors"][1] != "rhythmic":
+        raise AssertionError()
@@ -0,0 +1,59 @@
+from rymscraper import RymBrowser, RymCache, RymFetcher, RymScheduler
+
+URL = "https://rateyourmusic.com/artist/pinback"
+
+
+class ListFetcher(RymFetcher.RymFetcher):
+    """Fetcher returning a list of (html, status) responses in order."""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def fetch(self, url):
+        return self.fetch_page(url)[0]
+
+    def fetch_page(self, url):
+        html, status = self.responses.pop(0)
+        return html, len(html), status
+
+
+def make_browser(tmp_path, responses):
+    return RymBrowser.RymBrowser(
+        scheduler=RymScheduler.RymScheduler(backoff_base=0, max_retries=2),
+        cache=RymCache.RymCache(path=str(tmp_path / "cache.sqlite")),
+        fetcher=ListFetcher(responses),
+    )
+
+
+def test_RymFetcherRateLimitStatus(tmp_path):
+    browser = make_browser(
+        tmp_path, [("<html>Too many requests</html>", 429), ("<html>Pinback</html>", 200)]
+    )
+    browser.get_url(URL)
+    if browser.get_page_source() != "<html>Pinback</html>":
+        raise AssertionError()
+    if browser.metrics.get("rate_limits") != 1 or browser.metrics.get("retries") != 1:
+        raise AssertionError()
+    if browser.cache.get(URL) != "<html>Pinback</html>":
+        raise AssertionError()
+
+
+def test_RymFetcherErrorNotCached(tmp_path):
+    browser = make_browser(tmp_path, [("<html>Forbidden</html>", 403)])
+    try:
+        browser.get_url(URL)
+    except Exception:
+        pass
+    else:
+        raise AssertionError()
+    if browser.cache.get(URL) is not None:
+        raise AssertionError()
+
+
+def test_RymFetcherAbstract():
+    try:
+        RymFetcher.RymFetcher()
+    except TypeError:
+        pass
+    else:
+        raise AssertionError()
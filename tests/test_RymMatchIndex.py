@@ -0,0 +1,48 @@
+from rymscraper import RymMatchIndex, utils
+
+
+def test_normalize_name():
+    if RymMatchIndex.normalize_name("  Björk -  Début & Post!") != "bjork debut and post":
+        raise AssertionError()
+
+
+def test_RymMatchIndexQuery():
+    index = RymMatchIndex.RymMatchIndex(
+        ["OK Computer", "Kid A", "Hail to the Thief", "Amnesiac"],
+        ["url1", "url2", "url3", "url4"],
+    )
+    if index.best("ok computer!")[2] != "url1":
+        raise AssertionError()
+
+    if index.best("Pablo Honey") is not None:
+        raise AssertionError()
+
+    matches = index.query("Kid", limit=2, score_cutoff=0)
+    if len(matches) != 2 or matches[0][0] != "Kid A":
+        raise AssertionError()
+
+
+def test_RymMatchIndexLocalizedNames():
+    index = RymMatchIndex.RymMatchIndex(["Kyary Pamyu Pamyu [きゃりーぱみゅぱみゅ]", "Perfume"])
+
+    if index.best("Kyary Pamyu Pamyu")[0] != "Kyary Pamyu Pamyu [きゃりーぱみゅぱみゅ]":
+        raise AssertionError()
+
+    if index.best("きゃりーぱみゅぱみゅ")[0] != "Kyary Pamyu Pamyu [きゃりーぱみゅぱみゅ]":
+        raise AssertionError()
+
+
+def test_RymMatchIndexQueryMany():
+    index = RymMatchIndex.RymMatchIndex(["Loveless", "Isn't Anything", "m b v"])
+    matches = index.query_many(["loveless", "isnt anything", "Siamese Dream"])
+
+    if [x[0] if x else None for x in matches] != ["Loveless", "Isn't Anything", None]:
+        raise AssertionError()
+
+
+def test_get_close_matches_icase():
+    possibilities = ["Pinback", "The Pinback Tribute Band", "Radiohead"]
+    if utils.get_close_matches_icase("PINBACK", possibilities, n=1) != ["Pinback"]:
+        raise AssertionError()
+    if utils.get_close_matches_icase("Aphex Twin", possibilities):
+        raise AssertionError()
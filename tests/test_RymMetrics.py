@@ -0,0 +1,28 @@
+from rymscraper import RymMetrics
+
+
+def test_RymMetricsCounters():
+    metrics = RymMetrics.RymMetrics()
+    events = []
+    metrics.on("bytes", lambda event, page_type, value, data: events.append(value))
+    metrics.emit("bytes", "chart", 100)
+    metrics.emit("bytes", "chart", 50)
+    metrics.emit("bytes", "release", 10)
+    metrics.emit("retries", "chart")
+
+    if metrics.get("bytes", "chart") != 150:
+        raise AssertionError()
+    if metrics.get("bytes") != 160:
+        raise AssertionError()
+    if events != [100, 50, 10]:
+        raise AssertionError()
+
+
+def test_RymMetricsPrometheus():
+    metrics = RymMetrics.RymMetrics()
+    metrics.emit("rate_limits", "chart")
+    text = metrics.to_prometheus()
+    if "# TYPE rymscraper_rate_limits_total counter" not in text:
+        raise AssertionError()
+    if 'rymscraper_rate_limits_total{page_type="chart"} 1' not in text:
+        raise AssertionError()
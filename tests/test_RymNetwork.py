@@ -0,0 +1,477 @@
+import asyncio
+import json
+import random
+import time
+from benchmarks import pages as benchmark_pages
+from rymscraper import RymBrowser, RymFetcher, RymStore, RymUrl, rymscraper, utils
+
+BASE_URL = "https://rateyourmusic.com"
+URL_ALBUM = f"{BASE_URL}/release/album/pinback/summer-in-abaddon/"
+
+
+def make_album_page(name: str, artist: str) -> str:
+    return (
+        f'<html><body><div class="album_title">{name}\n \nBy {artist}</div>'
+        '<table class="album_info"><tr><th>Type</th><td>Album</td></tr></table>'
+        "</body></html>"
+    )
+
+
+def serve_pages(network, pages):
+    """Replaces the page loads of the browsers of a network by the html of
+    pages, an url missing from pages raising an exception."""
+    loaded = []
+
+    def patch(browser):
+        def get_url(url, use_cache=True, interactive=False, page_type=None):
+            url = str(url)
+            loaded.append(url)
+            if url not in pages:
+                raise Exception(f"{url} not found.")
+            browser.page_type = page_type or "other"
+            browser.source = pages[url]
+
+        browser.get_url = get_url
+
+    for browser in network.browsers:
+        patch(browser)
+    return loaded
+
+
+def test_RymNetworkMapOrder():
+    network = rymscraper.RymNetwork(workers=4, requests_per_minute=None)
+
+    def function(item):
+        # the items finish in a random order
+        time.sleep(random.uniform(0, 0.02))
+        if item % 5 == 0:
+            raise Exception("Failing item.")
+        return item * 2
+
+    results = network._map(function, list(range(1, 21)))
+    if results != [None if x % 5 == 0 else x * 2 for x in range(1, 21)]:
+        raise AssertionError()
+
+
+def test_RymNetworkFailingUrl():
+    network = rymscraper.RymNetwork(workers=2, requests_per_minute=None)
+    urls = [f"{BASE_URL}/release/album/artist/album-{i}/" for i in range(6)]
+    pages = {url: make_album_page(f"Album {i}", "Artist") for i, url in enumerate(urls)}
+    del pages[urls[3]]
+    serve_pages(network, pages)
+
+    list_albums_infos = network.get_albums_infos(urls=urls)
+    if [x["Name"] if x else None for x in list_albums_infos] != [
+        "Album 0",
+        "Album 1",
+        "Album 2",
+        None,
+        "Album 4",
+        "Album 5",
+    ]:
+        raise AssertionError()
+    # every browser is back in the pool
+    if network._idle_browsers.qsize() != 2:
+        raise AssertionError()
+
+
+def make_search_page(artists) -> str:
+    return "<html><body>" + "".join(
+        f'<a class="searchpage" href="{url}">{name}</a>' for name, url in artists
+    ) + "</body></html>"
+
+
+def make_artist_page(albums) -> str:
+    return "<html><body>" + "".join(
+        f'<div class="disco_mainline"><a href="{url}">{name}</a></div>'
+        for name, url in albums
+    ) + "</body></html>"
+
+
+def test_group_album_names():
+    groups = utils.group_album_names(
+        ["Pinback - Summer in Abaddon", "No separator", "pinback  - Autumn of the Seraphs"]
+    )
+    if groups != {
+        "Pinback": ["Pinback - Summer in Abaddon", "pinback  - Autumn of the Seraphs"]
+    }:
+        raise AssertionError()
+
+
+def test_RymNetworkAlbumNames():
+    network = rymscraper.RymNetwork(workers=2, requests_per_minute=None)
+    albums = [
+        ("Summer in Abaddon", "/release/album/pinback/summer-in-abaddon/"),
+        ("Autumn of the Seraphs", "/release/album/pinback/autumn-of-the-seraphs/"),
+        ("Blue Screen Life", "/release/album/pinback/blue-screen-life/"),
+    ]
+    pages = {
+        f"{BASE_URL}/search?searchtype=a&searchterm=Pinback": make_search_page(
+            [("Pinback", "/artist/pinback")]
+        ),
+        f"{BASE_URL}/artist/pinback": make_artist_page(albums),
+    }
+    for name, url in albums:
+        pages[f"{BASE_URL}{url}"] = make_album_page(name, "Pinback")
+    loaded = serve_pages(network, pages)
+
+    list_albums_infos = network.get_albums_infos(
+        names=[
+            "Pinback - Blue Screen Life",
+            "No separator",
+            "pinback - summer in abaddon",
+            "Pinback - Autumn of the Seraphs",
+        ]
+    )
+    if [x["Name"] if x else None for x in list_albums_infos] != [
+        "Blue Screen Life",
+        None,
+        "Summer in Abaddon",
+        "Autumn of the Seraphs",
+    ]:
+        raise AssertionError()
+    # the artist is searched and its page loaded once for all its albums
+    if loaded.count(f"{BASE_URL}/artist/pinback") != 1 or len(loaded) != 5:
+        raise AssertionError()
+
+
+def test_RymNetworkArtistName():
+    network = rymscraper.RymNetwork(requests_per_minute=None)
+    pages = {
+        f"{BASE_URL}/search?searchtype=a&searchterm=pinback": make_search_page(
+            [
+                ("The Pinback Tribute Band", "/artist/the-pinback-tribute-band"),
+                ("Pinback", "/artist/pinback"),
+            ]
+        ),
+        f"{BASE_URL}/artist/pinback": benchmark_pages.make_artist_page(2),
+    }
+    serve_pages(network, pages)
+
+    # the best match of the search results, not the first one
+    if network.get_artist_infos(name="pinback")["Name"] != "Pinback":
+        raise AssertionError()
+    list_artists_infos = network.get_artists_infos(names=["pinback"], typed=True)
+    if list_artists_infos[0].name != "Pinback":
+        raise AssertionError()
+
+
+def test_RymNetworkChartFailure():
+    network = rymscraper.RymNetwork(requests_per_minute=None)
+    url = RymUrl.RymUrl()
+    # the second page is missing
+    pages = {str(url): benchmark_pages.make_chart_page(10, 1)}
+    loaded = serve_pages(network, pages)
+
+    rows = []
+    try:
+        for row in network.iter_chart_infos(url):
+            rows.append(row)
+    except Exception:
+        pass
+    else:
+        raise AssertionError()
+    if len(rows) != 10 or url.page != 2:
+        raise AssertionError()
+
+    # the extraction is resumed from the failed page
+    pages[str(url)] = benchmark_pages.make_chart_page(10, 2, next_page=False)
+    rows += network.get_chart_infos(url)
+    if [x["Rank"] for x in rows] != [str(x) for x in range(1, 21)]:
+        raise AssertionError()
+    if loaded.count(str(RymUrl.RymUrl(page=2))) != 2:
+        raise AssertionError()
+
+
+def test_RymNetworkChartPartial():
+    network = rymscraper.RymNetwork(requests_per_minute=None)
+    url = RymUrl.RymUrl()
+    # the second page is missing
+    serve_pages(network, {str(url): benchmark_pages.make_chart_page(10, 1)})
+    # the rows of the first page are kept
+    rows = network.get_chart_infos(url)
+    if len(rows) != 10 or url.page != 2:
+        raise AssertionError()
+    charts = network.get_charts_infos([RymUrl.RymUrl()])
+    if charts != {str(RymUrl.RymUrl()): None}:
+        raise AssertionError()
+
+
+def test_RymNetworkChartMinRatings():
+    network = rymscraper.RymNetwork(requests_per_minute=None)
+    # filtered by rateyourmusic, the pages of the chart having more ratings
+    pages = {
+        str(RymUrl.RymUrl(min_ratings=500)): benchmark_pages.make_chart_page(10, 1),
+        str(RymUrl.RymUrl(min_ratings=500, page=2)): benchmark_pages.make_chart_page(
+            10, 2, next_page=False
+        ),
+    }
+    serve_pages(network, pages)
+    url = RymUrl.RymUrl()
+    rows = network.get_chart_infos(url, min_ratings=500)
+    if len(rows) != 20 or url.min_ratings != 500:
+        raise AssertionError()
+
+
+def test_RymNetworkChartDeltaFailure(tmp_path):
+    network = rymscraper.RymNetwork(requests_per_minute=None)
+    snapshot = str(tmp_path / "chart.json")
+    url = RymUrl.RymUrl()
+    pages = {
+        str(RymUrl.RymUrl(page=1)): benchmark_pages.make_chart_page(10, 1),
+        str(RymUrl.RymUrl(page=2)): benchmark_pages.make_chart_page(10, 2, False),
+    }
+    serve_pages(network, pages)
+    network.get_chart_delta(url, snapshot)
+    with open(snapshot, encoding="utf-8") as f:
+        saved = json.load(f)
+    if saved["url"] != str(RymUrl.RymUrl(page=1)) or sorted(saved["pages"]) != [
+        "1",
+        "2",
+    ]:
+        raise AssertionError()
+
+    # the first page changed, the second one fails
+    pages[str(RymUrl.RymUrl(page=1))] = pages[str(RymUrl.RymUrl(page=1))].replace(
+        ">99999<", ">99990<"
+    )
+    del pages[str(RymUrl.RymUrl(page=2))]
+    try:
+        network.get_chart_delta(RymUrl.RymUrl(), snapshot)
+    except Exception:
+        pass
+    else:
+        raise AssertionError()
+    with open(snapshot, encoding="utf-8") as f:
+        if json.load(f) != saved:
+            raise AssertionError()
+
+
+def test_RymNetworkChartStore(tmp_path):
+    store = RymStore.RymStore(str(tmp_path / "store.sqlite"))
+    network = rymscraper.RymNetwork(store=store, requests_per_minute=None)
+    url = str(RymUrl.RymUrl())
+    pages = {url: benchmark_pages.make_chart_page(10, 1, next_page=False)}
+    loaded = serve_pages(network, pages)
+
+    network.get_chart_infos(url)
+    network.get_chart_infos(url)
+    if loaded != [url]:
+        raise AssertionError()
+    # the delta compares the chart to the snapshot, not to the store
+    network.get_chart_delta(url, str(tmp_path / "chart.json"))
+    if loaded != [url, url]:
+        raise AssertionError()
+    # the chart pages of the store expire
+    network.chart_max_age = 0
+    network.get_chart_infos(url)
+    if loaded != [url, url, url]:
+        raise AssertionError()
+    store.close()
+
+
+def test_RymNetworkChartDeltaMaxPage(tmp_path):
+    network = rymscraper.RymNetwork(requests_per_minute=None)
+    snapshot = str(tmp_path / "chart.json")
+    pages = {
+        str(RymUrl.RymUrl(page=1)): benchmark_pages.make_chart_page(10, 1),
+        str(RymUrl.RymUrl(page=2)): benchmark_pages.make_chart_page(10, 2),
+        str(RymUrl.RymUrl(page=3)): benchmark_pages.make_chart_page(10, 3, False),
+    }
+    loaded = serve_pages(network, pages)
+    network.get_chart_delta(RymUrl.RymUrl(), snapshot)
+
+    # the first page changed, the next ones aren't extracted
+    pages[str(RymUrl.RymUrl(page=1))] = pages[str(RymUrl.RymUrl(page=1))].replace(
+        ">99999<", ">99990<"
+    )
+    delta = network.get_chart_delta(RymUrl.RymUrl(), snapshot, max_page=1)
+    if delta["removed"] or len(delta["changed"]) != 1:
+        raise AssertionError()
+    if loaded[3:] != [str(RymUrl.RymUrl(page=1))]:
+        raise AssertionError()
+    with open(snapshot, encoding="utf-8") as f:
+        if sorted(json.load(f)["pages"]) != ["1", "2", "3"]:
+            raise AssertionError()
+
+
+def make_timeline_page(lines) -> str:
+    return (
+        '<html><body><div class="catalog_list" id="catalog_list">'
+        + "".join(
+            f'<div class="catalog_line"><div class="catalog_date">{x["Date"]}</div>'
+            f'<span class="catalog_user">{x["User"]}</span></div>'
+            for x in lines
+        )
+        + "</div></body></html>"
+    )
+
+
+def serve_timeline(browser, timeline_pages):
+    """Replaces the firefox of a browser by the pages of a timeline, the
+    next link of a page loading the following one."""
+    state = {"loads": 0, "page": 0}
+
+    class Element:
+        def find_elements(self, by, value):
+            return [self] if state["page"] < len(timeline_pages) - 1 else []
+
+        def find_element(self, by, value):
+            return self
+
+    def get_url(url, use_cache=True, interactive=False, page_type=None):
+        state["loads"] += 1
+        state["page"] = 0
+        browser.source = timeline_pages[0]
+
+    def click_and_wait(element, watched=None, timeout=None, name=None):
+        state["page"] += 1
+        browser.source = timeline_pages[state["page"]]
+
+    browser.get_url = get_url
+    browser.click_and_wait = click_and_wait
+    browser.find_element = lambda by, value: Element()
+    browser.execute_script = lambda script, *args: None
+    return state
+
+
+def make_timeline_lines(users):
+    return [{"Date": "12 Oct 2020", "User": user} for user in users]
+
+
+def test_get_album_timeline_since():
+    browser = RymBrowser.RymBrowser()
+    lines = make_timeline_lines([f"user{i}" for i in range(9)])
+    state = serve_timeline(
+        browser, [make_timeline_page(lines[i : i + 3]) for i in range(0, 9, 3)]
+    )
+    browser.get_url(URL_ALBUM)
+    # the last page isn't loaded
+    if utils.get_album_timeline(browser, since=lines[5]) != lines[:5]:
+        raise AssertionError()
+    if state["page"] != 1:
+        raise AssertionError()
+
+
+def test_RymNetworkTimelineStore(tmp_path):
+    store = RymStore.RymStore(str(tmp_path / "store.sqlite"))
+    network = rymscraper.RymNetwork(store=store, requests_per_minute=None)
+    lines = make_timeline_lines(["a", "b", "c", "d"])
+    state = serve_timeline(
+        network.browser, [make_timeline_page(lines[:2]), make_timeline_page(lines[2:])]
+    )
+    if network.get_album_timeline(URL_ALBUM) != lines:
+        raise AssertionError()
+
+    # the new lines are extracted until the first stored one
+    new_lines = make_timeline_lines(["new1", "new2"])
+    state = serve_timeline(
+        network.browser,
+        [make_timeline_page(new_lines + lines[:1]), make_timeline_page(lines[1:])],
+    )
+    network.max_age = 0
+    if network.get_album_timeline(URL_ALBUM) != new_lines + lines:
+        raise AssertionError()
+    if state["page"] != 0 or store.get_timeline(URL_ALBUM) != new_lines + lines:
+        raise AssertionError()
+
+    # a fresh timeline is read from the store, cut at since
+    network.max_age = None
+    if network.get_album_timeline(URL_ALBUM, since=lines[0]) != new_lines:
+        raise AssertionError()
+    if state["loads"] != 1:
+        raise AssertionError()
+    store.close()
+
+
+def make_release_page(ranked: str) -> str:
+    return (
+        '<html><body><table class="album_info"><tr><th>Type</th><td>Album</td></tr>'
+        f"<tr><th>Ranked</th><td>{ranked}</td></tr></table></body></html>"
+    )
+
+
+def test_RymNetworkComplementaryInfos():
+    network = rymscraper.RymNetwork(workers=2, requests_per_minute=None)
+    urls = [f"{BASE_URL}/release/album/artist/album-{i}/" for i in range(4)]
+    pages = {
+        url: make_release_page(f"#{i + 1} for 2004, #{i + 100} overall")
+        for i, url in enumerate(urls)
+    }
+    loaded = serve_pages(network, pages)
+    # the last release is in the discographies of both artists
+    list_discs = [
+        {"Artist": "Artist 1", "URL": urls[0], "Year": "2004"},
+        {"Artist": "Artist 1", "URL": urls[3], "Year": "2004"},
+        {"Artist": "Artist 2", "URL": urls[1], "Year": "2004"},
+        {"Artist": "Artist 2", "URL": urls[2], "Year": "2004"},
+        {"Artist": "Artist 2", "URL": urls[3], "Year": "2004"},
+    ]
+    list_discs = network._add_complementary_infos(list_discs)
+    if sorted(loaded) != sorted(urls):
+        raise AssertionError()
+    if [(x["Artist"], x["Rank Year"], x["Rank Overall"]) for x in list_discs] != [
+        ("Artist 1", "1", "100"),
+        ("Artist 1", "4", "103"),
+        ("Artist 2", "2", "101"),
+        ("Artist 2", "3", "102"),
+        ("Artist 2", "4", "103"),
+    ]:
+        raise AssertionError()
+
+
+class SlowChartFetcher(RymFetcher.RymFetcher):
+    """Fetcher returning a one page chart after a delay."""
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.urls = []
+
+    def fetch(self, url):
+        self.urls.append(str(url))
+        time.sleep(self.delay)
+        return benchmark_pages.make_chart_page(10, 1, next_page=False)
+
+
+def test_AsyncRymNetworkCancel():
+    fetcher = SlowChartFetcher(0.05)
+    network = rymscraper.AsyncRymNetwork(requests_per_minute=None)
+    network.network.browser.fetcher = fetcher
+    urls = [RymUrl.RymUrl(year=year) for year in range(2000, 2020)]
+
+    async def cancel_sweep():
+        task = asyncio.ensure_future(network.get_charts_infos(urls))
+        await asyncio.sleep(0.12)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_sweep())
+    # waits for the thread of the cancelled call
+    network.close()
+    if not 0 < len(fetcher.urls) < 5:
+        raise AssertionError()
+
+
+def test_AsyncRymNetworkCheckpoint(tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.jsonl")
+    urls = [f"{BASE_URL}/release/album/artist/album-{i}/" for i in range(3)]
+    pages = {url: make_album_page(f"Album {i}", "Artist") for i, url in enumerate(urls)}
+
+    async def extract():
+        async with rymscraper.AsyncRymNetwork(
+            workers=2, requests_per_minute=None, checkpoint=checkpoint
+        ) as network:
+            loaded = serve_pages(network.network, pages)
+            list_albums_infos = await network.get_albums_infos(urls=urls)
+        return [x["Name"] for x in list_albums_infos], loaded
+
+    names, loaded = asyncio.run(extract())
+    if names != ["Album 0", "Album 1", "Album 2"] or len(loaded) != 3:
+        raise AssertionError()
+    # the urls of the checkpoint aren't loaded again
+    names, loaded = asyncio.run(extract())
+    if names != ["Album 0", "Album 1", "Album 2"] or loaded:
+        raise AssertionError()
@@ -0,0 +1,121 @@
+import datetime
+from rymscraper import RymRecords
+
+
+def test_ChartRow():
+    dict_row = {
+        "Rank": "12",
+        "Artist": "Kendrick Lamar",
+        "Album": "To Pimp a Butterfly",
+        "Date": "15 March 2015",
+        "Genres": "Jazz Rap, Conscious Hip Hop",
+        "RYM Rating": "4.38",
+        "Ratings": "71234",
+        "Reviews": "NA",
+    }
+    row = RymRecords.ChartRow.from_dict(dict_row)
+    if row.rank != 12 or row.rating != 4.38 or row.ratings != 71234:
+        raise AssertionError()
+    if row.date != datetime.date(2015, 3, 15) or row.reviews is not None:
+        raise AssertionError()
+    if row.genres != ("Jazz Rap", "Conscious Hip Hop"):
+        raise AssertionError()
+    if row.to_dict() != dict_row:
+        raise AssertionError()
+
+
+def test_ReleaseExtra():
+    dict_disc = {
+        "Artist": "Pinback",
+        "Category": "Album",
+        "Name": "Summer in Abaddon",
+        "URL": "https://rateyourmusic.com/release/album/pinback/summer-in-abaddon/",
+        "Date": "October 2004",
+        "Year": "2004",
+        "Average Rating": "3.71",
+        "Ratings": "12345",
+        "Reviews": "123",
+        "Type": "Album",
+        "Rank Overall": "1234",
+    }
+    release = RymRecords.Release.from_dict(dict_disc)
+    if release.date != datetime.date(2004, 10, 1) or release.rank_overall != 1234:
+        raise AssertionError()
+    if release.extra != {"Type": "Album"}:
+        raise AssertionError()
+    if release.to_dict() != dict_disc:
+        raise AssertionError()
+
+
+def test_parse_date():
+    if RymRecords.parse_date("13 Aug 2004") != (datetime.date(2004, 8, 13), "%d %b %Y"):
+        raise AssertionError()
+    if RymRecords.parse_date("NA") != (None, "NA"):
+        raise AssertionError()
+
+
+def test_RoundTrip():
+    # texts which aren't rendered back as they were by their typed value
+    dict_row = {
+        "Rank": "1",
+        "Artist": "Radiohead",
+        "Album": "OK Computer",
+        "Date": "",
+        "Genres": "Alternative Rock",
+        "RYM Rating": "4.3",
+        "Ratings": "71,234",
+        "Reviews": "",
+    }
+    row = RymRecords.ChartRow.from_dict(dict_row)
+    if row.rating != 4.3 or row.ratings != 71234 or row.reviews is not None:
+        raise AssertionError()
+    # the styles of the texts are kept instead of the texts
+    if row.extra is not None or row.to_dict() != dict_row:
+        raise AssertionError()
+    # a text matching no style is kept in extra
+    row = RymRecords.ChartRow.from_dict({**dict_row, "Rank": "#1"})
+    if row.rank != 1 or row.to_dict() != {**dict_row, "Rank": "#1"}:
+        raise AssertionError()
+
+
+def test_Album():
+    dict_album = {
+        "Name": "Summer in Abaddon",
+        "Artist": "Pinback",
+        "Type": "Album",
+        "Released": "12 October 2004",
+        "RYM Rating": "3.61 / 5.0 from 7,890 ratings",
+        "Ranked": "#12 for 2004",
+        "Genres": "Indie Rock, Math Rock\nSlowcore",
+        "Descriptors": "melancholic, rhythmic",
+        "Track listing": ["Non-Photo Blue", "Syracuse"],
+    }
+    album = RymRecords.Album.from_dict(dict_album)
+    if album.released != datetime.date(2004, 10, 12):
+        raise AssertionError()
+    if album.rating != 3.61 or album.ratings != 7890:
+        raise AssertionError()
+    if album.primary_genres != ("Indie Rock", "Math Rock"):
+        raise AssertionError()
+    if album.secondary_genres != ("Slowcore",) or album.descriptors[0] != "melancholic":
+        raise AssertionError()
+    if album.extra != {"Ranked": "#12 for 2004"} or album.colorscheme is not None:
+        raise AssertionError()
+    if album.to_dict() != dict_album:
+        raise AssertionError()
+
+
+def test_ArtistFormed():
+    dict_artist = {
+        "Name": "Pinback",
+        "Formed": "January 1998, San Diego, CA, United States",
+        "Members": "Armistead Burwell Smith IV, Zach Smith",
+        "Genres": "Indie Rock, Math Rock",
+    }
+    artist = RymRecords.Artist.from_dict(dict_artist)
+    if artist.formed != datetime.date(1998, 1, 1) or artist.born is not None:
+        raise AssertionError()
+    if artist.genres != ("Indie Rock", "Math Rock"):
+        raise AssertionError()
+    if artist.to_dict() != dict_artist:
+        raise AssertionError()
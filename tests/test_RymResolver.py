@@ -0,0 +1,29 @@
+from rymscraper import RymResolver
+
+
+def test_RymResolverPersistence(tmp_path):
+    path = str(tmp_path / "resolver.json")
+    resolver = RymResolver.RymResolver(path)
+    resolver.set_artist_urls("The  Beatles", ["https://rateyourmusic.com/artist/the-beatles"])
+    resolver.set_album_index(
+        "https://rateyourmusic.com/artist/the-beatles/",
+        [["Abbey Road", "https://rateyourmusic.com/release/album/the-beatles/abbey-road/"]],
+    )
+    resolver.save()
+
+    resolver = RymResolver.RymResolver(path)
+    if resolver.get_artist_urls("the beatles") != [
+        "https://rateyourmusic.com/artist/the-beatles"
+    ]:
+        raise AssertionError()
+
+    if resolver.get_album_index("https://rateyourmusic.com/artist/the-beatles")[0][0] != "Abbey Road":
+        raise AssertionError()
+
+
+def test_RymResolverTTL():
+    resolver = RymResolver.RymResolver(ttl=-1)
+    resolver.set_artist_urls("Pinback", ["https://rateyourmusic.com/artist/pinback"])
+
+    if resolver.get_artist_urls("Pinback") is not None:
+        raise AssertionError()
@@ -0,0 +1,43 @@
+import time
+from rymscraper import RymScheduler
+
+
+def test_RymSchedulerTokenBucket():
+    scheduler = RymScheduler.RymScheduler(requests_per_minute=600)
+    start = time.monotonic()
+    for _ in range(4):
+        scheduler.wait()
+
+    # first request is free, the next ones are spaced by 0.1 second
+    if time.monotonic() - start < 0.29:
+        raise AssertionError()
+
+
+def test_RymSchedulerAIMD():
+    scheduler = RymScheduler.RymScheduler(
+        requests_per_minute=60, min_requests_per_minute=20, probe_interval=0
+    )
+    scheduler.on_rate_limited()
+    if scheduler.requests_per_minute != 30:
+        raise AssertionError()
+
+    scheduler.on_rate_limited()
+    if scheduler.requests_per_minute != 20:
+        raise AssertionError()
+
+    scheduler.on_success()
+    if scheduler.requests_per_minute != 21:
+        raise AssertionError()
+
+    for _ in range(100):
+        scheduler.on_success()
+    if scheduler.requests_per_minute != 60:
+        raise AssertionError()
+
+
+def test_RymSchedulerBackoff():
+    scheduler = RymScheduler.RymScheduler(backoff_base=2, backoff_max=10)
+    for attempt, cap in [(0, 2), (1, 4), (2, 8), (5, 10)]:
+        delay = scheduler.get_backoff(attempt)
+        if not cap / 2 <= delay <= cap:
+            raise AssertionError()
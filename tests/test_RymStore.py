@@ -0,0 +1,61 @@
+from rymscraper import RymStore
+
+ALBUM = {
+    "Name": "Get to Heaven",
+    "Artist": "Everything Everything",
+    "Type": "Album",
+    "Released": "22 June 2015",
+    "RYM Rating": "3.61 / 5.0 from 7,890 ratings",
+    "Genres": "Art Pop, Progressive Pop\nIndietronica",
+}
+
+
+def test_RymStoreAlbum(tmp_path):
+    store = RymStore.RymStore(path=str(tmp_path / "store.sqlite"))
+    url = "https://rateyourmusic.com/release/album/everything-everything/get-to-heaven/"
+    store.set_album(url, ALBUM)
+
+    # same album with another spelling of the url
+    if store.get_album(url.rstrip("/")) != ALBUM:
+        raise AssertionError()
+
+    if store.get_album(url, max_age=0) is not None:
+        raise AssertionError()
+
+    if store.find_albums(artist="everything everything", year=2015, genre="indietronica") != [
+        ALBUM
+    ]:
+        raise AssertionError()
+
+    if store.find_albums(min_rating=3.7):
+        raise AssertionError()
+
+
+def test_RymStoreChartPage(tmp_path):
+    store = RymStore.RymStore(path=str(tmp_path / "store.sqlite"))
+    url = "https://rateyourmusic.com/charts/top/album/all-time/1/"
+    rows = [
+        {"Rank": str(rank), "Artist": "Artist", "Album": f"Album {rank}", "Date": "2015"}
+        for rank in range(1, 4)
+    ]
+    store.set_chart_page(url, rows, True)
+
+    if store.get_chart_page(url) != (rows, True):
+        raise AssertionError()
+
+
+def test_RymStoreTimelineEntry(tmp_path):
+    store = RymStore.RymStore(path=str(tmp_path / "store.sqlite"))
+    url = "https://rateyourmusic.com/release/album/pinback/summer-in-abaddon/"
+    if store.get_timeline_entry(url) != (None, False):
+        raise AssertionError()
+    timeline = [{"Date": "12 Oct 2020", "User": "user"}]
+    store.set_timeline(url, timeline)
+
+    if store.get_timeline_entry(url) != (timeline, True):
+        raise AssertionError()
+    # an old timeline is still returned
+    if store.get_timeline_entry(url, max_age=0) != (timeline, False):
+        raise AssertionError()
+    if store.get_timeline(url, max_age=0) is not None:
+        raise AssertionError()
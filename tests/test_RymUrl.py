@@ -19,3 +19,55 @@ def test_RymUrlAdvanced():
         != "https://rateyourmusic.com/charts/top/release/2010s/g:rock/loc:france/1/"
     ):
         raise AssertionError()
+
+
+def test_RymUrlSweep():
+    urls = RymUrl.get_sweep(years=["2015", "2016"], genres=["rock", None, "rock"])
+    if [str(x) for x in urls] != [
+        "https://rateyourmusic.com/charts/top/album/2015/g:rock/1/",
+        "https://rateyourmusic.com/charts/top/album/2015/1/",
+        "https://rateyourmusic.com/charts/top/album/2016/g:rock/1/",
+        "https://rateyourmusic.com/charts/top/album/2016/1/",
+    ]:
+        raise AssertionError()
+
+
+def test_RymUrlParse():
+    url = RymUrl.RymUrl.from_url(
+        "https://rateyourmusic.com/charts/top/album,ep/2010s/g:ambient,blues/d:epic/s:classical%2dmusic/loc:bouvet%2disland/minr:200/pop:5/3/"
+    )
+    if (url.kind, url.year, url.page) != ("album,ep", "2010s", 3):
+        raise AssertionError()
+    if (url.secondary_genres, url.origin_countries) != (
+        "classical-music",
+        "bouvet-island",
+    ):
+        raise AssertionError()
+    if (url.min_ratings, url.popularity) != (200, 5):
+        raise AssertionError()
+    if RymUrl.RymUrl.from_url(str(url)) != url:
+        raise AssertionError()
+
+
+def test_RymUrlCanonical():
+    url = RymUrl.RymUrl(genres="Rock,-Heavy Metal,rock", min_ratings=100, page=2)
+    parsed = RymUrl.RymUrl.from_url(
+        "http://www.rateyourmusic.com/charts/top/album/all-time/minr:100/g:-heavy%2dmetal,rock/2"
+    )
+    if (
+        str(url)
+        != "https://rateyourmusic.com/charts/top/album/all-time/g:rock,-heavy-metal/minr:100/2/"
+    ):
+        raise AssertionError()
+    if url != parsed or hash(url) != hash(parsed):
+        raise AssertionError()
+    if RymUrl.RymUrl.from_url("https://rateyourmusic.com/charts/top/album/2015/") != (
+        RymUrl.RymUrl(year=2015)
+    ):
+        raise AssertionError()
+
+
+def test_RymUrlSweepCanonical():
+    urls = RymUrl.get_sweep(genres=["rock,ambient", "Ambient,Rock"])
+    if len(urls) != 1:
+        raise AssertionError()
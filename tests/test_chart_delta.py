@@ -0,0 +1,52 @@
+from rymscraper import utils
+
+
+def make_row(rank, album, ratings="100", reviews="10", rating="4.00"):
+    return {
+        "Rank": rank,
+        "Artist": "Artist",
+        "Album": album,
+        "Date": "2015",
+        "Genres": "Jazz Rap",
+        "RYM Rating": rating,
+        "Ratings": ratings,
+        "Reviews": reviews,
+    }
+
+
+def test_chart_delta():
+    previous_rows = [make_row("1", "A"), make_row("2", "B"), make_row("3", "C")]
+    rows = [make_row("1", "B"), make_row("2", "A", ratings="110"), make_row("3", "D")]
+    delta = utils.get_chart_delta(previous_rows, rows)
+    if [x["Album"] for x in delta["new"]] != ["D"]:
+        raise AssertionError()
+    if [x["Album"] for x in delta["removed"]] != ["C"]:
+        raise AssertionError()
+    if [(x["Album"], x["Previous Rank"]) for x in delta["moved"]] != [
+        ("B", "2"),
+        ("A", "1"),
+    ]:
+        raise AssertionError()
+    if [(x["Album"], x["Previous Ratings"]) for x in delta["changed"]] != [("A", "100")]:
+        raise AssertionError()
+
+
+def test_same_chart_page():
+    rows = [make_row("1", "A"), make_row("2", "B")]
+    if not utils.is_same_chart_page(rows, [dict(x) for x in rows]):
+        raise AssertionError()
+    if utils.is_same_chart_page(rows, [make_row("1", "A"), make_row("2", "B", reviews="11")]):
+        raise AssertionError()
+
+
+def test_cut_chart_rows():
+    rows = [make_row(str(rank), str(rank), ratings=str(1000 - rank)) for rank in range(1, 6)]
+    if utils.cut_chart_rows(rows, max_rank=3) != (rows[:3], True):
+        raise AssertionError()
+    if utils.cut_chart_rows(rows, max_rank=10) != (rows, False):
+        raise AssertionError()
+    if utils.cut_chart_rows(rows, min_ratings=997) != (rows[:3], False):
+        raise AssertionError()
+    # the next pages can have rows above min_ratings
+    if utils.cut_chart_rows(rows, min_ratings=2000) != ([], False):
+        raise AssertionError()
@@ -0,0 +1,26 @@
+from benchmarks import bench_chart, pages
+from rymscraper import utils
+
+
+def get_chart_pages():
+    # last page without pagination link, and page without any chart
+    return [source for _, source in pages.get_corpus("chart")] + [
+        pages.make_chart_page(10, 3, next_page=False),
+        pages.make_page("Empty chart", "<div>No chart</div>"),
+    ]
+
+
+def test_chart_page_infos():
+    for source in get_chart_pages():
+        reference = bench_chart.get_chart_page_infos_reference(source)
+        if utils.get_chart_page_infos(source) != reference:
+            raise AssertionError()
+
+
+def test_chart_page_infos_selectolax():
+    if utils.HTMLParser is None:
+        return
+    for source in get_chart_pages():
+        reference = bench_chart.get_chart_page_infos_reference(source)
+        if utils.get_chart_page_infos(source, parser="selectolax") != reference:
+            raise AssertionError()